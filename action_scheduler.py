@@ -0,0 +1,253 @@
+"""Per-account pacing of LinkedIn actions.
+
+Every page view, connect click and note send goes through the account's
+scheduler. Each action type has a token bucket that sets its sustained rate and
+burst size, optional daily and weekly caps, and a small random jitter. An action
+fires as soon as its bucket has a token, rather than after a fixed sleep, so
+invites go out as fast as the budget allows without exceeding it. Counts used
+for the caps are kept in the lead store's SQLite database, so they survive
+restarts.
+"""
+import time
+import random
+import datetime
+import threading
+
+ACTION_LOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS action_log (
+    account TEXT NOT NULL,
+    action TEXT NOT NULL,
+    day TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (account, action, day)
+);
+"""
+
+
+class ActionPolicy:
+    def __init__(self, per_hour, burst=1, daily_cap=None, weekly_cap=None,
+                 jitter_median=0.5, jitter_sigma=0.5, jitter_max=3.0):
+        self.per_hour = per_hour
+        self.burst = burst
+        self.daily_cap = daily_cap
+        self.weekly_cap = weekly_cap
+        # Lognormal jitter added before an action fires: median seconds, spread and hard ceiling
+        self.jitter_median = jitter_median
+        self.jitter_sigma = jitter_sigma
+        self.jitter_max = jitter_max
+
+    def with_overrides(self, **fields):
+        values = dict(vars(self))
+        values.update(fields)
+        return ActionPolicy(**values)
+
+    def jitter(self):
+        if self.jitter_median <= 0:
+            return 0.0
+        return min(self.jitter_max, random.lognormvariate(0, self.jitter_sigma) * self.jitter_median)
+
+
+DEFAULT_POLICIES = {
+    'page_view': ActionPolicy(per_hour=240, burst=5, jitter_median=0.3),
+    'connect': ActionPolicy(per_hour=30, burst=3, daily_cap=80, weekly_cap=200, jitter_median=0.8),
+    'note_send': ActionPolicy(per_hour=30, burst=3, daily_cap=80, weekly_cap=200, jitter_median=0.5),
+}
+
+
+class TokenBucket:
+    def __init__(self, per_hour, burst):
+        self.rate = per_hour / 3600.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """Seconds until a token is available, 0 if one is available now."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        if self.rate <= 0:
+            return float('inf')
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+    def reconfigure(self, per_hour, burst):
+        """Change the rate and size in place, keeping the tokens already earned (up to the new size)."""
+        self._refill()
+        self.rate = per_hour / 3600.0
+        self.capacity = max(1, burst)
+        self.tokens = min(self.tokens, self.capacity)
+
+
+class ActionScheduler:
+    def __init__(self, account, lead_store, policies=None):
+        self.account = account
+        self.conn = lead_store.conn
+        self.store_lock = lead_store.lock
+        self.lock = threading.Lock()
+        self.policies = {}
+        self.buckets = {}
+        with self.store_lock:
+            self.conn.executescript(ACTION_LOG_SCHEMA)
+        self.configure(policies or DEFAULT_POLICIES)
+
+    def resolve_policy(self, action, policy):
+        """An ActionPolicy, or a dict of fields applied on top of the action's current policy."""
+        if isinstance(policy, dict):
+            base = self.policies.get(action) or DEFAULT_POLICIES.get(action) or ActionPolicy(per_hour=60)
+            policy = base.with_overrides(**policy)
+        return policy
+
+    def configure(self, overrides):
+        """Change the account's policies. Values may be ActionPolicy objects or dicts of fields to override."""
+        with self.lock:
+            for action, policy in overrides.items():
+                policy = self.resolve_policy(action, policy)
+                self.policies[action] = policy
+                # Reconfiguring must not hand out a fresh burst
+                if action in self.buckets:
+                    self.buckets[action].reconfigure(policy.per_hour, policy.burst)
+                else:
+                    self.buckets[action] = TokenBucket(policy.per_hour, policy.burst)
+
+    def for_job(self, overrides):
+        """A scheduler for one job with its own limits on top of this account's shared budget."""
+        return JobActionScheduler(self, overrides)
+
+    def _count_since(self, action, day):
+        with self.store_lock:
+            row = self.conn.execute(
+                "SELECT COALESCE(SUM(count), 0) AS total FROM action_log WHERE account = ? AND action = ? AND day >= ?",
+                (self.account, action, day)
+            ).fetchone()
+        return row['total']
+
+    def _record(self, action):
+        with self.store_lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO action_log (account, action, day, count) VALUES (?, ?, ?, 1)
+                ON CONFLICT(account, action, day) DO UPDATE SET count = count + 1
+                """,
+                (self.account, action, datetime.date.today().isoformat())
+            )
+
+    def remaining(self, action, policy=None):
+        """Actions left under the daily and weekly caps, None when uncapped.
+
+        A job's policy is checked in addition to the account's, never instead of it.
+        """
+        policies = [self.policies.get(action), policy]
+        daily_caps = [policy.daily_cap for policy in policies if policy is not None]
+        weekly_caps = [policy.weekly_cap for policy in policies if policy is not None]
+        daily_caps = [cap for cap in daily_caps if cap is not None]
+        weekly_caps = [cap for cap in weekly_caps if cap is not None]
+
+        today = datetime.date.today()
+        left = []
+        if daily_caps:
+            left.append(min(daily_caps) - self._count_since(action, today.isoformat()))
+        if weekly_caps:
+            week_start = (today - datetime.timedelta(days=6)).isoformat()
+            left.append(min(weekly_caps) - self._count_since(action, week_start))
+        return max(0, min(left)) if left else None
+
+    def wait_time(self, action, job_bucket=None):
+        with self.lock:
+            wait = self.buckets[action].wait_time()
+            if job_bucket is not None:
+                wait = max(wait, job_bucket.wait_time())
+            return wait
+
+    def acquire(self, action, should_continue=None, policy=None, job_bucket=None):
+        """Block until the action may fire, then count it.
+
+        policy and job_bucket are a job's own limits, applied on top of the account's.
+        Returns False without counting when a cap is exhausted or should_continue()
+        turns false while waiting.
+        """
+        if action not in self.policies:
+            return True
+        policy = policy or self.policies[action]
+        buckets = [self.buckets[action]] + ([job_bucket] if job_bucket is not None else [])
+        while True:
+            if should_continue and not should_continue():
+                return False
+            if self.remaining(action, policy) == 0:
+                return False
+            with self.lock:
+                wait = max(bucket.wait_time() for bucket in buckets)
+                if wait == 0:
+                    for bucket in buckets:
+                        bucket.take()
+                    break
+            # Sleep in short steps so a stopped job does not hang on a long refill
+            time.sleep(min(wait, 1.0))
+
+        time.sleep(policy.jitter())
+        self._record(action)
+        return True
+
+    def usage(self):
+        today = datetime.date.today().isoformat()
+        return {
+            action: {
+                'today': self._count_since(action, today),
+                'remaining': self.remaining(action),
+                'per_hour': policy.per_hour
+            }
+            for action, policy in self.policies.items()
+        }
+
+
+class JobActionScheduler:
+    """One job's limits on top of its account's scheduler.
+
+    Actions still draw from the account's buckets and are checked against its
+    caps; the job's rate and caps are clamped to the account's, so they can only
+    make it slower. The account's policies
+    are left unchanged, so other jobs keep the defaults.
+    """
+
+    def __init__(self, scheduler, overrides):
+        self.scheduler = scheduler
+        self.account = scheduler.account
+        self.policies = {}
+        self.buckets = {}
+        for action, policy in overrides.items():
+            policy = self._clamp(scheduler.policies.get(action), scheduler.resolve_policy(action, policy))
+            self.policies[action] = policy
+            self.buckets[action] = TokenBucket(policy.per_hour, policy.burst)
+
+    @staticmethod
+    def _clamp(account_policy, policy):
+        # A job may tighten the account's caps and rate, never loosen them
+        if account_policy is None:
+            return policy
+        fields = {}
+        for field in ('daily_cap', 'weekly_cap'):
+            caps = [cap for cap in (getattr(account_policy, field), getattr(policy, field)) if cap is not None]
+            fields[field] = min(caps) if caps else None
+        fields['per_hour'] = min(policy.per_hour, account_policy.per_hour)
+        fields['burst'] = min(policy.burst, account_policy.burst)
+        return policy.with_overrides(**fields)
+
+    def remaining(self, action):
+        return self.scheduler.remaining(action, self.policies.get(action))
+
+    def wait_time(self, action):
+        return self.scheduler.wait_time(action, self.buckets.get(action))
+
+    def acquire(self, action, should_continue=None):
+        return self.scheduler.acquire(action, should_continue, self.policies.get(action), self.buckets.get(action))
+
+    def usage(self):
+        return self.scheduler.usage()
@@ -0,0 +1,126 @@
+"""Async ASGI serving mode with the same routes as server.py.
+
+Run with:
+    uvicorn asgi_server:app --port 5000
+or:
+    python3 asgi_server.py
+
+Progress streams run on the event loop and wake up on ProgressBus
+notifications, so an idle /stream subscriber costs a coroutine instead of a
+worker thread. Lead counts, template history, the template list and the lead
+export are also served natively, with blocking store reads offloaded to the
+thread pool. Every other route is the Flask app from server.py, run in the
+thread pool through WSGI middleware, so routes and behaviour stay identical between both modes.
+
+Starlette and an ASGI server such as uvicorn are only needed for this mode:
+    pip install starlette uvicorn
+"""
+import json
+
+try:
+    from starlette.applications import Starlette
+    from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+    from starlette.responses import JSONResponse, Response, StreamingResponse
+    from starlette.routing import Mount, Route
+except ImportError as e:
+    raise ImportError("The async serving mode needs Starlette: pip install starlette uvicorn") from e
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:
+    from starlette.middleware.wsgi import WSGIMiddleware
+
+import server
+
+# Seconds between keep-alive comments on an idle stream
+STREAM_KEEPALIVE = 15.0
+
+
+def etag_matches(request, etag):
+    header = request.headers.get('if-none-match', '')
+    return any(candidate.strip().strip('"').removeprefix('W/"') in (etag, '*') for candidate in header.split(','))
+
+
+def etag_response(request, etag, body=None):
+    quoted = f'"{etag}"'
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={'ETag': quoted})
+    return Response(body, media_type='application/json', headers={'ETag': quoted})
+
+
+async def stream_progress(request):
+    queue_id = request.path_params['queue_id']
+    if server.progress_bus.get(queue_id) is None:
+        return JSONResponse({'error': 'Job not found'}, status_code=404)
+
+    last_id = server.parse_last_event_id(request.headers, request.query_params)
+
+    async def generate():
+        cursor = last_id
+        yield "retry: 2000\n\n"
+        while True:
+            events, dropped, closed = await server.progress_bus.wait_for_events_async(
+                queue_id, cursor, timeout=STREAM_KEEPALIVE)
+            if events:
+                cursor = events[-1]['id']
+                yield server.sse_frame(events, dropped)
+            elif closed:
+                yield "event: end\ndata: {}\n\n"
+                break
+            else:
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(generate(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+async def get_lead_counts(request):
+    etag, counts = server.lead_counter.snapshot()
+    return etag_response(request, etag, json.dumps({
+        'counts': counts,
+        'total': sum(item['count'] for item in counts)
+    }))
+
+
+async def get_templates(request):
+    etag, body = server.template_registry.snapshot()
+    return etag_response(request, etag, body)
+
+
+def history_endpoint(endpoint):
+    async def handler(request):
+        template = request.query_params.get('template')
+        if not template:
+            return JSONResponse([], status_code=400)
+        params = server.history_page_params(request.query_params)
+        # SQLite reads block, keep them off the event loop
+        body, next_cursor = await run_in_threadpool(server.history_page, endpoint, template, params)
+        headers = {'X-Next-Cursor': next_cursor} if next_cursor else None
+        return Response(body, media_type='application/json', headers=headers)
+    return handler
+
+
+async def export_leads(request):
+    fmt = request.query_params.get('format', 'ndjson').lower()
+    if fmt not in server.EXPORT_FORMATS:
+        return JSONResponse({'error': f"format must be one of {', '.join(server.EXPORT_FORMATS)}"}, status_code=400)
+    # Each chunk's store reads run in the thread pool
+    chunks = iterate_in_threadpool(server.export_chunks(fmt, server.export_filters(request.query_params)))
+    return StreamingResponse(chunks, media_type=server.EXPORT_FORMATS[fmt], headers=server.export_headers(fmt))
+
+
+app = Starlette(routes=[
+    Route('/stream/{queue_id}', stream_progress),
+    Route('/api/lead-counts', get_lead_counts),
+    Route('/api/templates', get_templates, methods=['GET']),
+    Route('/get_template_data', history_endpoint('data')),
+    Route('/get_template_history', history_endpoint('history')),
+    Route('/api/export/leads', export_leads),
+    # Everything else, including crawler control, runs as the Flask app in the thread pool
+    Mount('/', app=WSGIMiddleware(server.app)),
+])
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, port=5000)
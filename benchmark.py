@@ -0,0 +1,296 @@
+"""Offline benchmarks for the crawler, the lead storage paths and the server.
+
+Usage:
+    python3 benchmark.py storage [--sizes 10000,100000,1000000]
+    python3 benchmark.py crawl [--pages 4] [--per-page 25] [--profile lean] [--note-input bulk]
+    python3 benchmark.py server [--size 100000]
+    python3 benchmark.py all
+
+Add --json results.json to any command to keep the numbers for comparison
+between runs. Nothing touches LinkedIn or the real db/ folder: the crawl runs
+against fake_sales_navigator.py, and every run works in a temporary directory.
+
+- storage: generates a synthetic history of daily template files and times the
+  import, counts, history pages, the seen-lead index, batched saves and the
+  json/journal main-file paths.
+- crawl: needs Chrome and Selenium. Reports leads per minute, per-lead latency
+  percentiles and the per-phase breakdown from JobMetrics.
+- server: needs Flask. Times server startup and the lead-count and history
+  endpoints through Flask's test client.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import datetime
+import tempfile
+import resource
+import importlib
+
+from lead_store import LeadStore
+from lead_identity import SeenLeadIndex, canonical_member_id
+from lead_journal import LeadJournal
+from lead_stream import count_leads_in_file
+from file_utils import atomic_write_json, load_json_list
+from fake_sales_navigator import FakeSalesNavigator, synthetic_lead
+
+TEMPLATES = ['fds_it_dba', 'fds_sys_eng', 'fds_risk_management', 'fds_senior_tax',
+             'bukirmega_ppe', 'bukirmega_sales', 'bukirmega_marketing', 'otomultiartha_headcompliance']
+
+
+def percentiles(samples):
+    if not samples:
+        return {'p50': None, 'p90': None, 'p99': None}
+    ordered = sorted(samples)
+
+    def pick(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    return {'p50': pick(0.5), 'p90': pick(0.9), 'p99': pick(0.99)}
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def repeat(fn, times):
+    return [timed(fn)[0] for _ in range(times)]
+
+
+def peak_rss_mb():
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def history_lead(number, template, day):
+    lead = synthetic_lead(number)
+    return {
+        'name': lead['name'],
+        'profile_url': f"https://www.linkedin.com{lead['profile_url']}",
+        'title': lead['title'],
+        'company': lead['company'],
+        'connection_status': 'success' if number % 5 else 'pending',
+        'note_sent': f"Hi {lead['name']}, I'd love to connect.",
+        'search_url': f"https://www.linkedin.com/sales/search/people?query=({template})",
+        'timestamp': f"{day} 10:00:00"
+    }
+
+
+def generate_history(root, total, days=90):
+    """Write `total` leads as db/YYYY-MM-DD-<template>.json daily files spread over `days` days."""
+    db_dir = os.path.join(root, 'db')
+    os.makedirs(db_dir, exist_ok=True)
+    today = datetime.date.today()
+    files = [(template, (today - datetime.timedelta(days=offset)).isoformat())
+             for offset in range(days) for template in TEMPLATES]
+    per_file, extra = divmod(total, len(files))
+
+    number = 0
+    for index, (template, day) in enumerate(files):
+        count = per_file + (1 if index < extra else 0)
+        if not count:
+            continue
+        leads = [history_lead(number + offset, template, day) for offset in range(count)]
+        number += count
+        with open(os.path.join(db_dir, f"{day}-{template}.json"), 'w') as f:
+            json.dump(leads, f)
+    return db_dir
+
+
+def bench_storage(size, days=90, save_batches=500):
+    root = tempfile.mkdtemp(prefix=f'bench-storage-{size}-')
+    try:
+        generate_seconds, db_dir = timed(generate_history, root, size, days)
+        store = LeadStore(os.path.join(db_dir, 'leads.db'))
+        data_dir = os.path.join(root, 'data')
+        results = {'leads': size, 'generate_s': generate_seconds}
+
+        results['import_s'], imported = timed(store.import_json_files, db_dir, data_dir)
+        results['imported'] = imported
+        results['reimport_unchanged_s'], _ = timed(store.import_json_files, db_dir, data_dir)
+
+        results['count_by_template_s'] = percentiles(repeat(store.count_by_template, 20))
+        results['count_leads_s'] = percentiles(repeat(store.count_leads, 20))
+
+        template = TEMPLATES[0]
+        results['history_first_page_s'] = percentiles(repeat(lambda: store.get_history(template, limit=30), 10))
+
+        def full_history():
+            pages, cursor = 0, None
+            while True:
+                _, cursor = store.get_history(template, limit=30, cursor=cursor)
+                pages += 1
+                if not cursor:
+                    return pages
+        results['history_full_scan_s'], results['history_pages'] = timed(full_history)
+
+        results['seen_index_build_s'], seen = timed(SeenLeadIndex, store)
+        probes = [canonical_member_id(f"https://www.linkedin.com{synthetic_lead(random.randrange(size * 2))['profile_url']}")
+                  for _ in range(100000)]
+        lookup_seconds, _ = timed(lambda: sum(1 for probe in probes if probe in seen))
+        results['seen_lookup_ns'] = lookup_seconds / len(probes) * 1e9
+
+        # The crawler's steady-state save path: batches of 10 new leads
+        batch_times = []
+        number = size
+        for _ in range(save_batches):
+            batch = [history_lead(number + offset, template, datetime.date.today().isoformat()) for offset in range(10)]
+            number += 10
+            batch_times.append(timed(store.add_leads, batch, template, datetime.date.today().isoformat())[0])
+        results['save_batch_s'] = percentiles(batch_times)
+
+        # json storage mode rewrites the whole main file on every flush; journal mode appends
+        main_file = os.path.join(db_dir, 'leads_data.json')
+        all_leads = [dict(row) for row in store.conn.execute("SELECT profile_url, name FROM leads")]
+        results['main_file_write_s'], _ = timed(atomic_write_json, main_file, all_leads)
+        results['main_file_load_s'], _ = timed(load_json_list, main_file)
+        results['main_file_stream_count_s'], _ = timed(count_leads_in_file, main_file)
+
+        journal = LeadJournal(os.path.join(db_dir, 'leads_data.jsonl'), main_file_path=main_file)
+        results['journal_first_append_s'], _ = timed(journal.append, history_lead(number, template, 'journal'))
+        append_times = [timed(journal.append, history_lead(number + 1 + offset, template, 'journal'))[0]
+                        for offset in range(1000)]
+        journal.close()
+        results['journal_append_s'] = percentiles(append_times)
+
+        store.close()
+        results['peak_rss_mb'] = peak_rss_mb()
+        return results
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_crawl(pages=4, per_page=25, profile='lean', page_latency=0.0, note_input='bulk'):
+    import sales_navigator_scraper
+    from sales_navigator_scraper import SalesNavigatorScraper
+    from session_store import SessionStore
+    from action_scheduler import ActionScheduler, ActionPolicy
+
+    root = tempfile.mkdtemp(prefix='bench-crawl-')
+    site = FakeSalesNavigator(pages=pages, leads_per_page=per_page, page_latency=page_latency).start()
+    # Persist into the temporary directory instead of the configured db folder
+    sales_navigator_scraper.DB_DIR = root
+    try:
+        store = LeadStore(os.path.join(root, 'leads.db'))
+        # Budgets are not what is being measured here, so let every action through at once
+        unlimited = ActionPolicy(per_hour=10 ** 9, burst=10 ** 6, jitter_median=0)
+        scheduler = ActionScheduler('benchmark@example.com', store,
+                                    {action: unlimited for action in ('page_view', 'connect', 'note_send')})
+        scraper = SalesNavigatorScraper(
+            email='benchmark@example.com',
+            password='',
+            connect_note='Hi [lead_name], I would love to connect.',
+            template_name='benchmark',
+            lead_store=store,
+            session_store=SessionStore(os.path.join(root, 'sessions')),
+            browser_profile=profile,
+            action_scheduler=scheduler,
+            note_input=note_input
+        )
+        elapsed, _ = timed(scraper.direct_access_and_connect, site.search_url)
+        scraper.metrics.finish()
+        snapshot = scraper.metrics.snapshot()
+        connected = snapshot['counters'].get('lead_connected', 0)
+        return {
+            'pages': pages,
+            'leads_offered': pages * per_page,
+            'leads_connected': connected,
+            'invites_received': site.sent_count(),
+            'elapsed_s': elapsed,
+            'leads_per_minute': connected / (elapsed / 60) if elapsed else 0.0,
+            'lead_latency_s': snapshot['lead_seconds'],
+            'phases': {phase: {'count': stats['count'], 'mean_s': stats['mean'], 'max_s': stats['max']}
+                       for phase, stats in snapshot['phases'].items()}
+        }
+    finally:
+        site.stop()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_server(size=100000, days=90):
+    root = tempfile.mkdtemp(prefix='bench-server-')
+    cwd = os.getcwd()
+    try:
+        generate_history(root, size, days)
+        # server.py works relative to the current directory and imports at startup
+        sys.path.insert(0, cwd)
+        os.chdir(root)
+        startup_s, server = timed(importlib.import_module, 'server')
+        client = server.app.test_client()
+        template = TEMPLATES[0]
+        results = {'leads': size, 'startup_import_s': startup_s}
+
+        results['lead_counts_s'] = percentiles(repeat(lambda: client.get('/api/lead-counts'), 50))
+        etag = client.get('/api/lead-counts').headers.get('ETag')
+        results['lead_counts_304_s'] = percentiles(
+            repeat(lambda: client.get('/api/lead-counts', headers={'If-None-Match': etag}), 50))
+
+        results['history_cold_s'], _ = timed(client.get, f'/get_template_history?template={template}')
+        results['history_cached_s'] = percentiles(
+            repeat(lambda: client.get(f'/get_template_history?template={template}'), 50))
+        results['template_data_s'] = percentiles(
+            repeat(lambda: client.get(f'/get_template_data?template={template}&limit=90'), 20))
+        results['peak_rss_mb'] = peak_rss_mb()
+        return results
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def format_value(value):
+    if isinstance(value, dict):
+        return ' '.join(f"{key}={format_value(item)}" for key, item in value.items())
+    if isinstance(value, float):
+        return f"{value:.6f}" if value < 100 else f"{value:.0f}"
+    return str(value)
+
+
+def print_results(title, results):
+    print(f"\n== {title}")
+    for key, value in results.items():
+        if key == 'phases':
+            for phase, stats in sorted(value.items(), key=lambda item: -item[1]['mean_s'] * item[1]['count']):
+                print(f"  phase {phase:<22} {format_value(stats)}")
+        else:
+            print(f"  {key:<28} {format_value(value)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline crawler, storage and server benchmarks')
+    parser.add_argument('suite', choices=('storage', 'crawl', 'server', 'all'))
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='lead history sizes for the storage suite')
+    parser.add_argument('--days', type=int, default=90, help='days of history the synthetic leads are spread over')
+    parser.add_argument('--pages', type=int, default=4)
+    parser.add_argument('--per-page', type=int, default=25)
+    parser.add_argument('--profile', default='lean', choices=('full', 'lean'))
+    parser.add_argument('--note-input', default='bulk', choices=('bulk', 'chunked', 'per_char'))
+    parser.add_argument('--page-latency', type=float, default=0.0, help='seconds the fake site waits per request')
+    parser.add_argument('--size', type=int, default=100000, help='lead history size for the server suite')
+    parser.add_argument('--json', help='write all results to this file')
+    args = parser.parse_args()
+
+    report = {}
+    if args.suite in ('storage', 'all'):
+        for size in (int(size) for size in args.sizes.split(',')):
+            report[f'storage_{size}'] = bench_storage(size, args.days)
+            print_results(f'storage, {size} leads', report[f'storage_{size}'])
+    if args.suite in ('crawl', 'all'):
+        report['crawl'] = bench_crawl(args.pages, args.per_page, args.profile, args.page_latency, args.note_input)
+        print_results(f'crawl, {args.pages} pages x {args.per_page} leads ({args.profile})', report['crawl'])
+    if args.suite in ('server', 'all'):
+        report['server'] = bench_server(args.size, args.days)
+        print_results(f'server, {args.size} leads', report['server'])
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""Single round-trip extraction of lead cards from a search results page.
+
+One injected script reads every card's name, profile URL, title, company and
+"more actions" button, so the crawler does not spend several WebDriver calls
+per card before it acts on it.
+"""
+
+EXTRACT_CARDS_SCRIPT = """
+const container = document.getElementById(arguments[0]);
+const list = container ? container.querySelector('ol') : null;
+if (!list) return [];
+const text = function(card, selector) {
+    const element = card.querySelector(selector);
+    return element ? element.innerText.trim() : null;
+};
+return Array.from(list.querySelectorAll(':scope > li')).map(function(card, index) {
+    const nameLink = card.querySelector('[data-view-name="search-results-lead-name"]');
+    const actionButton = card.querySelector('button[aria-label*="more actions"]');
+    return {
+        index: index,
+        name: nameLink ? nameLink.innerText.trim() : null,
+        profile_url: nameLink ? nameLink.href : null,
+        title: text(card, '[data-anonymize="title"]'),
+        company: text(card, '[data-anonymize="company-name"]'),
+        has_actions: Boolean(actionButton && !actionButton.disabled),
+        action_button: actionButton
+    };
+});
+"""
+
+
+def extract_cards(driver, container_id='search-results-container'):
+    """Return one record per lead card; action_button is a WebElement or None."""
+    return driver.execute_script(EXTRACT_CARDS_SCRIPT, container_id) or []
@@ -0,0 +1,91 @@
+"""Per-search checkpoints so a stopped or crashed crawl can resume where it left off.
+
+A checkpoint holds the page the crawl was on, the last lead card it handled on
+that page and the number of leads saved so far. It is written after every page
+and when the crawl stops, and removed once the search has been paged through
+to the end.
+"""
+import time
+import hashlib
+import urllib.parse
+
+CHECKPOINT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl_checkpoints (
+    search_key TEXT PRIMARY KEY,
+    search_url TEXT NOT NULL,
+    template TEXT,
+    page INTEGER NOT NULL,
+    last_member_id TEXT,
+    leads_saved INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Query parameters that change between visits of the same search
+VOLATILE_PARAMS = ('page', 'sessionId')
+
+
+def _strip_params(search_url, names):
+    # Works on the raw query so Sales Navigator's (...) query syntax is kept byte for byte
+    parts = urllib.parse.urlsplit(search_url)
+    query = [item for item in parts.query.split('&') if item and item.split('=', 1)[0] not in names]
+    return parts, query
+
+
+def search_key(search_url):
+    parts, query = _strip_params(search_url, VOLATILE_PARAMS)
+    normalized = urllib.parse.urlunsplit(parts._replace(query='&'.join(sorted(query)), fragment=''))
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:32]
+
+
+def with_page(search_url, page):
+    """Return the search URL opened directly on the given results page."""
+    parts, query = _strip_params(search_url, ('page',))
+    if page > 1:
+        query.append(f'page={page}')
+    return urllib.parse.urlunsplit(parts._replace(query='&'.join(query)))
+
+
+class CheckpointStore:
+    def __init__(self, lead_store):
+        # Shares the lead store's connection and lock
+        self.conn = lead_store.conn
+        self.lock = lead_store.lock
+        with self.lock:
+            self.conn.executescript(CHECKPOINT_SCHEMA)
+
+    def load(self, search_url):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT * FROM crawl_checkpoints WHERE search_key = ?", (search_key(search_url),)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def save(self, search_url, template, page, last_member_id, leads_saved):
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO crawl_checkpoints (search_key, search_url, template, page, last_member_id, leads_saved, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(search_key) DO UPDATE SET
+                    search_url = excluded.search_url,
+                    template = excluded.template,
+                    page = excluded.page,
+                    last_member_id = excluded.last_member_id,
+                    leads_saved = excluded.leads_saved,
+                    updated_at = excluded.updated_at
+                """,
+                (search_key(search_url), search_url, template, page, last_member_id, leads_saved, time.time())
+            )
+
+    def clear(self, search_url):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM crawl_checkpoints WHERE search_key = ?", (search_key(search_url),))
+
+    def list(self):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT search_url, template, page, last_member_id, leads_saved, updated_at "
+                "FROM crawl_checkpoints ORDER BY updated_at DESC"
+            ).fetchall()
+        return [dict(row) for row in rows]
@@ -0,0 +1,140 @@
+"""Non-blocking, structured logging for crawler runs.
+
+Log calls only put the record on a bounded in-memory queue; a QueueListener
+thread formats and writes it. The file sink gets one JSON object per line with
+the job ID, account, template and lead fields, and is rotated by size (or by
+time when LOG_ROTATE_WHEN is set). The console sink gets short text lines.
+Each sink has its own level. configure_logging() is idempotent, so every
+scraper can call it.
+
+Environment overrides: LOG_FILE, LOG_FILE_LEVEL, LOG_CONSOLE_LEVEL,
+LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ROTATE_WHEN (e.g. 'midnight').
+"""
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+
+LOGGER_NAME = 'linkedin_crawler'
+DEFAULT_LOG_FILE = 'linkedin_scraper.log'
+
+# Lead fields copied into log records; the note text and search URL are left out
+LEAD_LOG_FIELDS = ('name', 'member_id', 'profile_url', 'title', 'company', 'connection_status')
+
+_listener = None
+_queue_handler = None
+_lock = threading.Lock()
+_timestamp_cache = (None, None)
+
+
+def format_timestamp(now=None):
+    """'%Y-%m-%d %H:%M:%S' for the given time, formatted once per second."""
+    global _timestamp_cache
+    second = int(now if now is not None else time.time())
+    cached_second, cached = _timestamp_cache
+    if cached_second != second:
+        cached = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))
+        _timestamp_cache = (second, cached)
+    return cached
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': record.created,
+            'time': format_timestamp(record.created),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        entry.update(getattr(record, 'context', None) or {})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    def format(self, record):
+        context = getattr(record, 'context', None) or {}
+        job = f"[{context['job_id'][:8]}] " if context.get('job_id') else ''
+        return f"{format_timestamp(record.created)} - {record.levelname} - {job}{record.getMessage()}"
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: when the writer falls behind, records are dropped and counted."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _level(name, default):
+    return getattr(logging, str(os.environ.get(name, default)).upper(), logging.INFO)
+
+
+def configure_logging(log_file=None, file_level=None, console_level=None,
+                      max_bytes=None, backup_count=None, rotate_when=None, queue_size=10000):
+    """Set up the queue, sinks and listener once, and return the crawler's logger."""
+    global _listener, _queue_handler
+    logger = logging.getLogger(LOGGER_NAME)
+    with _lock:
+        if _listener is not None:
+            return logger
+
+        log_file = log_file or os.environ.get('LOG_FILE', DEFAULT_LOG_FILE)
+        rotate_when = rotate_when or os.environ.get('LOG_ROTATE_WHEN')
+        backup_count = backup_count if backup_count is not None else int(os.environ.get('LOG_BACKUP_COUNT', 5))
+        if rotate_when:
+            file_handler = logging.handlers.TimedRotatingFileHandler(
+                log_file, when=rotate_when, backupCount=backup_count, encoding='utf-8', delay=True)
+        else:
+            max_bytes = max_bytes or int(os.environ.get('LOG_MAX_BYTES', 10 * 1024 * 1024))
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+        file_handler.setFormatter(JsonFormatter())
+        file_handler.setLevel(file_level or _level('LOG_FILE_LEVEL', 'INFO'))
+
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(ConsoleFormatter())
+        console_handler.setLevel(console_level or _level('LOG_CONSOLE_LEVEL', 'INFO'))
+
+        log_queue = queue.Queue(maxsize=queue_size)
+        _queue_handler = DroppingQueueHandler(log_queue)
+        logger.addHandler(_queue_handler)
+        logger.setLevel(min(file_handler.level, console_handler.level))
+        # Records stop here; the root logger's handlers would write synchronously again
+        logger.propagate = False
+
+        _listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return logger
+
+
+def shutdown_logging():
+    """Write out queued records and stop the writer thread."""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        logging.getLogger(LOGGER_NAME).removeHandler(_queue_handler)
+        _listener = None
+        _queue_handler = None
+
+
+def dropped_records():
+    return _queue_handler.dropped if _queue_handler else 0
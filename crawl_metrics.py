@@ -0,0 +1,214 @@
+"""Per-phase timers and counters for crawler runs, rendered in Prometheus text format.
+
+Every job records into its own JobMetrics, which also feeds the process-wide
+histograms and counters in REGISTRY. /metrics renders the aggregate series
+plus a few per-job gauges, and /crawlers/<job_id>/metrics returns one job's
+breakdown as JSON.
+"""
+import time
+import threading
+import functools
+from contextlib import contextmanager
+
+from crawl_logging import dropped_records
+
+PHASE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+LEAD_LATENCY_BUCKETS = (1, 2, 5, 10, 15, 20, 30, 45, 60, 120, 300)
+LEADS_PER_MINUTE_BUCKETS = (0.5, 1, 2, 3, 4, 6, 8, 10, 15, 20, 30)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if value != float('inf') else '+Inf'
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self.labels = labels
+        # label values -> [bucket counts, sum, count]
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self.lock:
+            series = self.values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            for key, (counts, total, count) in sorted(self.values.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    labels = _format_labels(self.labels, key, ('le', _format_value(bound)))
+                    lines.append(f'{self.name}_bucket{labels} {bucket_count}')
+                labels = _format_labels(self.labels, key)
+                lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+                lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.phase_seconds = Histogram(
+            'crawler_phase_seconds', 'Time spent in each crawler phase', PHASE_BUCKETS, labels=('phase',))
+        self.lead_seconds = Histogram(
+            'crawler_lead_seconds', 'Time from reading a lead card to having its invite sent', LEAD_LATENCY_BUCKETS)
+        self.leads_per_minute = Histogram(
+            'crawler_leads_per_minute', 'Connected leads per minute of a finished job', LEADS_PER_MINUTE_BUCKETS)
+        self.events = Counter('crawler_events_total', 'Crawler events by kind', labels=('event',))
+        self.phase_errors = Counter('crawler_phase_errors_total', 'Phases that raised an error', labels=('phase',))
+
+    def render(self):
+        lines = []
+        for metric in (self.phase_seconds, self.lead_seconds, self.leads_per_minute, self.events, self.phase_errors):
+            lines.extend(metric.render())
+        # Counted by crawl_logging's queue handler when the log writer falls behind
+        lines.extend([
+            '# HELP crawler_log_records_dropped_total Log records dropped because the log queue was full',
+            '# TYPE crawler_log_records_dropped_total counter',
+            f'crawler_log_records_dropped_total {dropped_records()}'
+        ])
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+
+class JobMetrics:
+    def __init__(self, registry=REGISTRY):
+        self.registry = registry
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.finished_at = None
+        # phase -> {'count', 'total', 'max'}
+        self.phases = {}
+        self.counters = {}
+        self.lead_latencies = []
+
+    @contextmanager
+    def timer(self, phase):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.registry.phase_errors.inc(phase=phase)
+            raise
+        finally:
+            self.observe(phase, time.perf_counter() - started)
+
+    def observe(self, phase, seconds):
+        self.registry.phase_seconds.observe(seconds, phase=phase)
+        with self.lock:
+            stats = self.phases.setdefault(phase, {'count': 0, 'total': 0.0, 'max': 0.0})
+            stats['count'] += 1
+            stats['total'] += seconds
+            stats['max'] = max(stats['max'], seconds)
+
+    def incr(self, event, amount=1):
+        self.registry.events.inc(amount, event=event)
+        with self.lock:
+            self.counters[event] = self.counters.get(event, 0) + amount
+
+    def lead_finished(self, seconds):
+        self.registry.lead_seconds.observe(seconds)
+        self.incr('lead_connected')
+        with self.lock:
+            self.lead_latencies.append(seconds)
+
+    def leads_per_minute(self):
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        connected = self.counters.get('lead_connected', 0)
+        return connected / (elapsed / 60) if elapsed > 0 else 0.0
+
+    def finish(self):
+        if self.finished_at is not None:
+            return
+        self.finished_at = time.time()
+        if self.counters.get('lead_connected'):
+            self.registry.leads_per_minute.observe(self.leads_per_minute())
+
+    def snapshot(self):
+        with self.lock:
+            latencies = sorted(self.lead_latencies)
+            phases = {phase: dict(stats, mean=stats['total'] / stats['count']) for phase, stats in self.phases.items()}
+            counters = dict(self.counters)
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] if latencies else None
+
+        return {
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'leads_per_minute': self.leads_per_minute(),
+            'lead_seconds': {'p50': percentile(0.5), 'p90': percentile(0.9), 'p99': percentile(0.99)},
+            'phases': phases,
+            'counters': counters
+        }
+
+
+def render_job_metrics(jobs):
+    """Per-job gauges for (job_id, account, JobMetrics) tuples, appended to REGISTRY.render()."""
+    lines = [
+        '# HELP crawler_job_leads_per_minute Connected leads per minute of a job',
+        '# TYPE crawler_job_leads_per_minute gauge'
+    ]
+    phase_lines = [
+        '# HELP crawler_job_phase_seconds_total Time a job spent in each phase',
+        '# TYPE crawler_job_phase_seconds_total counter'
+    ]
+    for job_id, account, metrics in jobs:
+        labels = _format_labels(('job_id', 'account'), (job_id, account))
+        lines.append(f'crawler_job_leads_per_minute{labels} {_format_value(metrics.leads_per_minute())}')
+        for phase, stats in metrics.snapshot()['phases'].items():
+            phase_labels = _format_labels(('job_id', 'account', 'phase'), (job_id, account, phase))
+            phase_lines.append(f'crawler_job_phase_seconds_total{phase_labels} {_format_value(stats["total"])}')
+    return '\n'.join(lines + phase_lines) + '\n'
+
+
+def timed(phase):
+    """Decorator for scraper methods: times the call into self.metrics under the given phase."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.timer(phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,141 @@
+"""Bounded pool of concurrent crawler jobs.
+
+Every job gets its own UUID. At most `max_browsers` jobs run at once, and jobs
+for the same account wait for each other so a Sales Navigator login is never
+used by two browsers at the same time. Jobs for different accounts run in
+parallel.
+"""
+import time
+import threading
+from uuid import uuid4
+from collections import deque
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class CrawlJob:
+    def __init__(self, account, run, params=None):
+        self.id = str(uuid4())
+        self.account = account
+        self.run = run
+        self.params = params or {}
+        self.status = 'queued'
+        self.scraper = None
+        self.error = None
+        self.stop_requested = False
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'account': self.account,
+            'status': self.status,
+            'template': self.params.get('templateName'),
+            'leads': len(self.scraper.leads_data) if self.scraper else 0,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+class CrawlerPool:
+    def __init__(self, max_browsers=2, on_finish=None, max_finished=200):
+        self.max_browsers = max(1, max_browsers)
+        self.on_finish = on_finish
+        self.max_finished = max_finished
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.pending = deque()
+        self.busy_accounts = set()
+        self.running = 0
+
+    def submit(self, account, run, params=None):
+        """Queue run(job) for an account. Returns the job; it starts as soon as a slot is free."""
+        job = CrawlJob(account, run, params)
+        with self.lock:
+            self._prune()
+            self.jobs[job.id] = job
+            self.pending.append(job)
+        self._dispatch()
+        return job
+
+    def _prune(self):
+        # Caller holds self.lock. Forget the oldest finished jobs beyond max_finished
+        finished = [job for job in self.jobs.values() if job.status not in ACTIVE_STATUSES]
+        for job in sorted(finished, key=lambda job: job.finished_at or 0)[:-self.max_finished or None]:
+            del self.jobs[job.id]
+
+    def _dispatch(self):
+        to_start = []
+        with self.lock:
+            # Oldest job first, skipping accounts that already have a running browser
+            for job in list(self.pending):
+                if self.running >= self.max_browsers:
+                    break
+                if job.account in self.busy_accounts:
+                    continue
+                self.pending.remove(job)
+                self.busy_accounts.add(job.account)
+                self.running += 1
+                job.status = 'running'
+                job.started_at = time.time()
+                to_start.append(job)
+
+        for job in to_start:
+            threading.Thread(target=self._run_job, args=(job,), daemon=True).start()
+
+    def _run_job(self, job):
+        try:
+            job.run(job)
+            job.status = 'stopped' if job.stop_requested else 'completed'
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            with self.lock:
+                self.busy_accounts.discard(job.account)
+                self.running -= 1
+            if self.on_finish:
+                self.on_finish(job)
+            self._dispatch()
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def is_active(self, job_id):
+        job = self.jobs.get(job_id)
+        return job is not None and job.status in ACTIVE_STATUSES
+
+    def stop(self, job_id):
+        """Stop a queued or running job. Returns False if the job is unknown or already finished."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status not in ACTIVE_STATUSES:
+                return False
+            job.stop_requested = True
+            if job.status == 'queued':
+                self.pending.remove(job)
+                job.status = 'stopped'
+                job.finished_at = time.time()
+                queued = True
+            else:
+                queued = False
+
+        if queued:
+            if self.on_finish:
+                self.on_finish(job)
+        elif job.scraper:
+            job.scraper.stop()
+        return True
+
+    def stop_all(self):
+        return [job_id for job_id in list(self.jobs) if self.stop(job_id)]
+
+    def list_jobs(self):
+        with self.lock:
+            jobs = list(self.jobs.values())
+        return [job.to_dict() for job in jobs]
@@ -0,0 +1,180 @@
+"""Reusable browser sessions and cached ChromeDriver resolution.
+
+Jobs check a session out of the pool instead of launching Chrome, and hand it
+back when they finish, so back-to-back jobs for the same account skip the
+browser cold start and keep their login. Sessions are health-checked before
+they are handed out and closed after sitting idle too long.
+"""
+import os
+import json
+import time
+import shutil
+import threading
+
+from file_utils import atomic_write_json
+
+DRIVER_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'linkedin-crawler', 'chromedriver.json')
+
+# Re-check for a newer driver once a week; the cached binary is used in between
+DRIVER_CACHE_TTL = 7 * 24 * 3600
+
+
+def resolve_chromedriver(cache_path=DRIVER_CACHE_PATH, ttl=DRIVER_CACHE_TTL):
+    """Return a ChromeDriver binary path, hitting the network only when the cache is stale.
+
+    When the download fails (e.g. offline), the last cached binary or a
+    chromedriver found on PATH is used instead.
+    """
+    cached_path = None
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r') as f:
+                cached = json.load(f)
+            if os.path.exists(cached.get('path', '')):
+                cached_path = cached['path']
+                if time.time() - cached.get('resolved_at', 0) < ttl:
+                    return cached_path
+        except (json.JSONDecodeError, OSError):
+            pass
+
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        path = ChromeDriverManager().install()
+    except Exception:
+        path = cached_path or shutil.which('chromedriver')
+        if not path:
+            raise
+        return path
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    # Concurrent job starts may resolve at the same time; readers must never see a half-written cache
+    atomic_write_json(cache_path, {'path': path, 'resolved_at': time.time()}, indent=None)
+    return path
+
+
+def is_session_alive(driver):
+    try:
+        driver.execute_script('return 1')
+        return bool(driver.window_handles)
+    except Exception:
+        return False
+
+
+def quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class DriverPool:
+    """Idle sessions keyed by (account, browser profile).
+
+    Browsers in use by jobs and idle browsers together stay within
+    `max_browsers`: a job that has to launch a new browser first reserves a slot,
+    which closes the oldest idle sessions when needed.
+    """
+
+    def __init__(self, max_idle=2, idle_timeout=30 * 60, max_browsers=None):
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.max_browsers = max_browsers
+        self.lock = threading.Lock()
+        # (account, profile) -> [(driver, returned_at)], most recently returned last
+        self.idle = {}
+        # Browsers currently owned by jobs, checked out or launched after reserve()
+        self.in_use = 0
+
+    def checkout(self, account, profile='full'):
+        """Return a healthy idle session for the account and profile, or None if there is none."""
+        self._expire_idle()
+        while True:
+            with self.lock:
+                sessions = self.idle.get((account, profile))
+                if not sessions:
+                    return None
+                driver, _ = sessions.pop()
+                self.in_use += 1
+            if is_session_alive(driver):
+                return driver
+            with self.lock:
+                self.in_use -= 1
+            quit_driver(driver)
+
+    def reserve(self, account):
+        """Claim a slot for a new browser, closing idle sessions that would exceed the bound.
+
+        Idle sessions of the same account are always closed, so one login never runs in two browsers.
+        """
+        with self.lock:
+            self.in_use += 1
+            evicted = []
+            for key in [key for key in self.idle if key[0] == account]:
+                evicted.extend(driver for driver, _ in self.idle.pop(key))
+            while self.max_browsers and self._idle_count() and self.in_use + self._idle_count() > self.max_browsers:
+                evicted.append(self._pop_oldest())
+        for driver in evicted:
+            quit_driver(driver)
+
+    def unreserve(self):
+        """Give back a slot from reserve() whose browser never started."""
+        with self.lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def release(self, account, driver, profile='full'):
+        """Hand a session back for reuse, closing it if it is broken or the pool is full."""
+        if driver is None:
+            return
+        with self.lock:
+            self.in_use = max(0, self.in_use - 1)
+        if not is_session_alive(driver):
+            quit_driver(driver)
+            return
+
+        evicted = []
+        with self.lock:
+            self.idle.setdefault((account, profile), []).append((driver, time.monotonic()))
+            while self._idle_count() > self.max_idle or (
+                    self.max_browsers and self.in_use + self._idle_count() > self.max_browsers):
+                evicted.append(self._pop_oldest())
+        for driver in evicted:
+            quit_driver(driver)
+
+    def _idle_count(self):
+        return sum(len(sessions) for sessions in self.idle.values())
+
+    def _pop_oldest(self):
+        # Caller holds self.lock
+        key = min(
+            (key for key, sessions in self.idle.items() if sessions),
+            key=lambda key: self.idle[key][0][1]
+        )
+        driver, _ = self.idle[key].pop(0)
+        return driver
+
+    def _expire_idle(self):
+        expired = []
+        now = time.monotonic()
+        with self.lock:
+            for key, sessions in self.idle.items():
+                expired.extend(driver for driver, returned_at in sessions if now - returned_at > self.idle_timeout)
+                sessions[:] = [(driver, returned_at) for driver, returned_at in sessions
+                               if now - returned_at <= self.idle_timeout]
+        for driver in expired:
+            quit_driver(driver)
+
+    def idle_sessions(self):
+        """{account: {profile: idle session count}}"""
+        sessions_by_account = {}
+        with self.lock:
+            for (account, profile), sessions in self.idle.items():
+                if sessions:
+                    sessions_by_account.setdefault(account, {})[profile] = len(sessions)
+        return sessions_by_account
+
+    def close(self):
+        with self.lock:
+            drivers = [driver for sessions in self.idle.values() for driver, _ in sessions]
+            self.idle = {}
+        for driver in drivers:
+            quit_driver(driver)
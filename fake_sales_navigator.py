@@ -0,0 +1,229 @@
+"""Local stand-in for Sales Navigator search and lead pages, for offline benchmarks.
+
+Pages carry the same DOM hooks the scraper relies on: the
+search-results-container list, search-results-lead-name links, title and
+company fields, a "more actions" button whose menu holds Connect, the
+connect-cta-form__invitation note field, the connect-cta-form__send button and
+a Next button. Cards fill in as they scroll into view, and menus and the
+invitation form are only added to the DOM when opened, as on the real site.
+Sent invitations are counted server-side.
+
+Usage:
+    python3 fake_sales_navigator.py [port]
+"""
+import sys
+import html
+import time
+import random
+import threading
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+FIRST_NAMES = ['Andi', 'Budi', 'Citra', 'Dewi', 'Eka', 'Fajar', 'Gita', 'Hadi', 'Indah', 'Joko', 'Kartika', 'Lina']
+LAST_NAMES = ['Santoso', 'Wijaya', 'Pratama', 'Lestari', 'Saputra', 'Hidayat', 'Kusuma', 'Nugroho', 'Putri']
+TITLES = ['Database Administrator', 'System Engineer', 'Senior Tax Specialist', 'Risk Management Specialist',
+          'Sales Manager', 'Marketing Manager', 'Production Manager', 'Head of Compliance']
+COMPANIES = ['PT Maju Jaya', 'PT Sinar Abadi', 'PT Nusantara Data', 'PT Mega Karya', 'PT Oto Sejahtera']
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>%(title)s</title>
+<style>
+#search-results-container { height: 700px; overflow-y: auto; }
+#search-results-container li { height: 140px; border-bottom: 1px solid #ddd; }
+.actions-menu { position: absolute; background: #fff; border: 1px solid #999; }
+#connect-modal { position: fixed; top: 20%%; left: 30%%; background: #fff; border: 1px solid #333; padding: 16px; }
+</style>
+</head>
+<body>
+%(body)s
+<script>
+const MENU_DELAY = %(menu_delay)d;
+function closeMenus() { document.querySelectorAll('.actions-menu').forEach(function(menu) { menu.remove(); }); }
+function openConnectForm(name) {
+    closeMenus();
+    setTimeout(function() {
+        const modal = document.createElement('div');
+        modal.id = 'connect-modal';
+        modal.innerHTML = '<p>Invite ' + name + ' to connect</p>' +
+            '<textarea id="connect-cta-form__invitation" rows="4" cols="50"></textarea><br>' +
+            '<button class="connect-cta-form__send">Send Invitation</button>';
+        modal.querySelector('.connect-cta-form__send').addEventListener('click', function() {
+            fetch('/api/sent', {method: 'POST', body: name}).finally(function() { modal.remove(); });
+        });
+        document.body.appendChild(modal);
+    }, MENU_DELAY);
+}
+document.addEventListener('click', function(event) {
+    const button = event.target.closest('button[aria-label*="more actions"]');
+    if (!button) return;
+    closeMenus();
+    setTimeout(function() {
+        const menu = document.createElement('ul');
+        menu.className = 'actions-menu';
+        menu.innerHTML = '<li><button>Connect</button></li><li><button>Save</button></li>';
+        menu.querySelector('button').addEventListener('click', function() { openConnectForm(button.dataset.name); });
+        button.parentNode.appendChild(menu);
+    }, MENU_DELAY);
+});
+%(script)s
+</script>
+</body>
+</html>
+"""
+
+# Cards are filled in when they scroll into view, like the real lazy-rendered result list
+LAZY_CARDS_SCRIPT = """
+const container = document.getElementById('search-results-container');
+function renderVisible() {
+    const bottom = container.scrollTop + container.clientHeight + 140;
+    container.querySelectorAll('li[data-card]').forEach(function(card) {
+        if (card.offsetTop - container.offsetTop <= bottom) {
+            card.innerHTML = card.dataset.card;
+            card.removeAttribute('data-card');
+        }
+    });
+}
+container.addEventListener('scroll', function() { setTimeout(renderVisible, MENU_DELAY); });
+renderVisible();
+"""
+
+CARD_TEMPLATE = """<div>
+<a data-view-name="search-results-lead-name" href="%(profile_url)s">%(name)s</a>
+<div><span data-anonymize="title">%(title)s</span> at <a data-anonymize="company-name">%(company)s</a></div>
+<button aria-label="See more actions for %(name)s" data-name="%(name)s">...</button>
+</div>"""
+
+
+def synthetic_lead(number, seed=0):
+    rng = random.Random(number * 7919 + seed)
+    member_id = f"ACwBENCH{seed:02d}{number:08d}"
+    return {
+        'member_id': member_id,
+        'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        'title': rng.choice(TITLES),
+        'company': rng.choice(COMPANIES),
+        'profile_url': f"/sales/lead/{member_id},NAME_SEARCH,{member_id[-4:]}"
+    }
+
+
+class FakeSalesNavigator:
+    def __init__(self, pages=5, leads_per_page=25, port=0, page_latency=0.0, menu_delay=0.05, seed=0):
+        self.pages = pages
+        self.leads_per_page = leads_per_page
+        self.page_latency = page_latency
+        self.menu_delay = menu_delay
+        self.seed = seed
+        self.sent = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def search_url(self):
+        return f"{self.base_url}/sales/search/people?query=(benchmark)"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def sent_count(self):
+        with self.lock:
+            return len(self.sent)
+
+    def render_search_page(self, page):
+        page = max(1, min(page, self.pages))
+        cards = []
+        for offset in range(self.leads_per_page):
+            lead = synthetic_lead((page - 1) * self.leads_per_page + offset, self.seed)
+            card = CARD_TEMPLATE % {key: html.escape(value) for key, value in lead.items()}
+            cards.append(f'<li data-card="{html.escape(card)}"></li>')
+
+        next_url = f"{self.search_url}&page={page + 1}"
+        disabled = ' disabled' if page >= self.pages else ''
+        body = (
+            f'<h1>Lead results, page {page} of {self.pages}</h1>'
+            f'<div id="search-results-container"><ol>{"".join(cards)}</ol></div>'
+            f'<button aria-label="Next"{disabled} onclick="location.href=\'{html.escape(next_url)}\'">Next</button>'
+        )
+        return self._page('Sales Navigator (benchmark)', body, LAZY_CARDS_SCRIPT)
+
+    def render_lead_page(self, member_id):
+        number = int(member_id[-8:]) if member_id[-8:].isdigit() else 0
+        lead = synthetic_lead(number, self.seed)
+        body = (
+            f'<h1>{html.escape(lead["name"])}</h1><p>{html.escape(lead["title"])} at {html.escape(lead["company"])}</p>'
+            f'<button aria-label="See more actions for {html.escape(lead["name"])}" '
+            f'data-name="{html.escape(lead["name"])}">...</button>'
+        )
+        return self._page(lead['name'], body, '')
+
+    def _page(self, title, body, script):
+        return PAGE_TEMPLATE % {
+            'title': html.escape(title),
+            'body': body,
+            'script': script,
+            'menu_delay': int(self.menu_delay * 1000)
+        }
+
+    def _handler_class(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urllib.parse.urlsplit(self.path)
+                if site.page_latency:
+                    time.sleep(site.page_latency)
+                if url.path == '/sales/search/people':
+                    query = urllib.parse.parse_qs(url.query)
+                    self._send(site.render_search_page(int(query.get('page', ['1'])[0])))
+                elif url.path.startswith('/sales/lead/'):
+                    self._send(site.render_lead_page(url.path.rsplit('/', 1)[-1].split(',')[0]))
+                else:
+                    self._send('<html><body><a href="/sales/search/people">Search</a></body></html>')
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                name = self.rfile.read(length).decode('utf-8', 'replace')
+                with site.lock:
+                    site.sent.append(name)
+                self._send('{}', 'application/json')
+
+            def _send(self, body, content_type='text/html; charset=utf-8'):
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    site = FakeSalesNavigator(port=port).start()
+    print(f"Serving fake Sales Navigator at {site.search_url}")
+    try:
+        site.thread.join()
+    except KeyboardInterrupt:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
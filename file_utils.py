@@ -0,0 +1,55 @@
+"""Crash-safe JSON file helpers."""
+import os
+import json
+import time
+import tempfile
+import threading
+
+_path_locks = {}
+_path_locks_guard = threading.Lock()
+
+
+def path_lock(path):
+    """Process-wide lock for one file, held around a load + rewrite so concurrent jobs do not lose each other's writes."""
+    key = os.path.abspath(path)
+    with _path_locks_guard:
+        lock = _path_locks.get(key)
+        if lock is None:
+            lock = _path_locks[key] = threading.RLock()
+        return lock
+
+
+def atomic_write_json(path, data, indent=2):
+    """Write JSON through a temp file and rename, so readers never see a half-written file."""
+    # Each write gets its own temp file, so two writers never rename each other's file
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix='.tmp',
+                                    dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_json_list(path):
+    """Load a JSON list from path, returning [] when the file does not exist.
+
+    A file that cannot be parsed is moved aside to <path>.corrupt-<timestamp>
+    instead of being overwritten, so the next write cannot destroy it.
+    """
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except json.JSONDecodeError:
+        os.replace(path, f"{path}.corrupt-{time.strftime('%Y%m%d-%H%M%S')}")
+        return []
+    return data if isinstance(data, list) else []
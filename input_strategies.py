@@ -0,0 +1,117 @@
+"""Ways of entering text into the note and login fields.
+
+- 'bulk': one script call sets the value through the native setter and fires
+  input/change events, so the page's own listeners (character counter, Send
+  button state) update as if the user had typed.
+- 'chunked': send_keys a few words at a time, paced by a words-per-minute
+  model with jitter. A 250-character note takes a dozen round-trips instead of
+  250.
+- 'per_char': the original one-key-per-call typing with a 50-150 ms pause.
+
+Every strategy returns timing stats, which the scraper reports in its progress
+events.
+"""
+import re
+import abc
+import time
+import random
+
+SET_VALUE_SCRIPT = """
+const element = arguments[0];
+const prototype = element instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+const setter = Object.getOwnPropertyDescriptor(prototype, 'value').set;
+element.focus();
+setter.call(element, arguments[1]);
+element.dispatchEvent(new Event('input', {bubbles: true}));
+element.dispatchEvent(new Event('change', {bubbles: true}));
+return element.value.length;
+"""
+
+
+class InputStrategy(abc.ABC):
+    name = None
+
+    def enter(self, element, text):
+        """Type text into the element and return {'strategy', 'chars', 'round_trips', 'seconds'}."""
+        started = time.perf_counter()
+        round_trips = self._enter(element, text)
+        return {
+            'strategy': self.name,
+            'chars': len(text),
+            'round_trips': round_trips,
+            'seconds': time.perf_counter() - started
+        }
+
+    @abc.abstractmethod
+    def _enter(self, element, text):
+        """Type text into the element and return the number of WebDriver round-trips used."""
+
+
+class BulkInput(InputStrategy):
+    name = 'bulk'
+
+    def _enter(self, element, text):
+        element.click()
+        element.parent.execute_script(SET_VALUE_SCRIPT, element, text)
+        return 2
+
+
+class ChunkedTyping(InputStrategy):
+    name = 'chunked'
+
+    def __init__(self, wpm=90, words_per_chunk=3, jitter=0.3):
+        self.wpm = wpm
+        self.words_per_chunk = max(1, words_per_chunk)
+        self.jitter = jitter
+
+    def chunks(self, text):
+        # Words keep their trailing whitespace, so the joined chunks are exactly the text
+        words = re.findall(r'\S+\s*|\s+', text)
+        for index in range(0, len(words), self.words_per_chunk):
+            yield ''.join(words[index:index + self.words_per_chunk])
+
+    def _enter(self, element, text):
+        # Standard typing speed counts five characters as one word
+        seconds_per_char = 60.0 / (self.wpm * 5)
+        round_trips = 0
+        for chunk in self.chunks(text):
+            element.send_keys(chunk)
+            round_trips += 1
+            pause = len(chunk) * seconds_per_char
+            time.sleep(max(0.0, random.uniform(pause * (1 - self.jitter), pause * (1 + self.jitter))))
+        return round_trips
+
+
+class PerCharacterTyping(InputStrategy):
+    name = 'per_char'
+
+    def __init__(self, min_delay=0.05, max_delay=0.15):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+
+    def _enter(self, element, text):
+        for char in text:
+            element.send_keys(char)
+            time.sleep(random.uniform(self.min_delay, self.max_delay))
+        return len(text)
+
+
+STRATEGIES = {
+    'bulk': BulkInput,
+    'chunked': ChunkedTyping,
+    'per_char': PerCharacterTyping,
+}
+
+
+def make_input_strategy(spec):
+    """Build a strategy from a name ('chunked') or a dict ({'mode': 'chunked', 'wpm': 70})."""
+    if isinstance(spec, InputStrategy):
+        return spec
+    if isinstance(spec, dict):
+        options = dict(spec)
+        mode = options.pop('mode', 'chunked')
+    else:
+        mode, options = spec or 'chunked', {}
+    if mode not in STRATEGIES:
+        raise ValueError(f"input mode must be one of {tuple(STRATEGIES)}, got {mode!r}")
+    return STRATEGIES[mode](**options)
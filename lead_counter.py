@@ -0,0 +1,32 @@
+"""In-process lead counters per template.
+
+Seeded once from the lead store and bumped whenever the store saves new leads,
+so serving the counts costs O(templates) instead of a scan over every file.
+"""
+import threading
+
+
+class LeadCounter:
+    def __init__(self, counts=None):
+        self.lock = threading.Lock()
+        self.counts = dict(counts or {})
+        self.version = 0
+
+    def seed(self, counts):
+        with self.lock:
+            self.counts = dict(counts)
+            self.version += 1
+
+    def bump(self, template, amount=1):
+        if not template or amount <= 0:
+            return
+        with self.lock:
+            self.counts[template] = self.counts.get(template, 0) + amount
+            self.version += 1
+
+    def snapshot(self):
+        """Return (etag, [{'template': ..., 'count': ...}]) sorted by count, highest first."""
+        with self.lock:
+            version = self.version
+            items = sorted(self.counts.items(), key=lambda x: x[1], reverse=True)
+        return f"counts-{id(self):x}-{version}", [{'template': template, 'count': count} for template, count in items]
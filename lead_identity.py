@@ -0,0 +1,101 @@
+"""Canonical lead identity and the index of leads that were already contacted.
+
+Sales Navigator profile URLs carry a search-context suffix and a session token,
+e.g. /sales/lead/ACwAAEHHD78...,NAME_SEARCH,ZCmF?_ntb=..., so the same person
+shows up under many URLs. `canonical_member_id` reduces them to the stable
+member ID, and `SeenLeadIndex` answers "already contacted?" before any click.
+"""
+import re
+import math
+import hashlib
+import threading
+import urllib.parse
+
+SALES_PROFILE_PATTERN = re.compile(r'/sales/(?:lead|people)/([^,/]+)')
+PUBLIC_PROFILE_PATTERN = re.compile(r'/in/([^/]+)')
+
+
+def canonical_member_id(profile_url):
+    """Return a stable ID for a profile URL, or None for an empty URL."""
+    if not profile_url:
+        return None
+    path = urllib.parse.unquote(urllib.parse.urlsplit(profile_url).path)
+
+    match = SALES_PROFILE_PATTERN.search(path)
+    if match:
+        return match.group(1)
+
+    match = PUBLIC_PROFILE_PATTERN.search(path)
+    if match:
+        return f"in:{match.group(1).lower()}"
+
+    # Unknown layout: drop query string, fragment and trailing slash
+    return path.rstrip('/') or profile_url
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class SeenLeadIndex:
+    """Member IDs of every contacted lead, checked before the connect flow.
+
+    Imported leads that were never invited ('not_sent' or no status) are left
+    out, so the crawler can still contact them.
+
+    By default all IDs are kept in a set. With use_bloom=True only a Bloom filter
+    is kept in memory and positives are confirmed against the lead store, which
+    keeps memory small for very large histories.
+    """
+
+    def __init__(self, lead_store, use_bloom=False, error_rate=0.01):
+        self.lead_store = lead_store
+        self.use_bloom = use_bloom
+        self.lock = threading.Lock()
+        self.ids = set()
+        self.bloom = None
+
+        if use_bloom:
+            # Leave room for the history to double before the error rate degrades
+            self.bloom = BloomFilter(max(100000, lead_store.count_leads() * 2), error_rate)
+            for member_id in lead_store.iter_profile_keys(contacted_only=True):
+                self.bloom.add(member_id)
+        else:
+            self.ids.update(lead_store.iter_profile_keys(contacted_only=True))
+
+    def __contains__(self, member_id):
+        if not member_id:
+            return False
+        with self.lock:
+            if not self.use_bloom:
+                return member_id in self.ids
+            if member_id not in self.bloom:
+                return False
+            if member_id in self.ids:
+                return True
+        return self.lead_store.has_profile_key(member_id, contacted_only=True)
+
+    def add(self, member_id):
+        if not member_id:
+            return
+        with self.lock:
+            self.ids.add(member_id)
+            if self.bloom is not None:
+                self.bloom.add(member_id)
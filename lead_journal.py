@@ -0,0 +1,177 @@
+"""Append-only JSONL journal for leads_data.json.
+
+Each saved lead is written as a single JSON line, so saving a lead costs one
+small append instead of rewriting the whole history. `compact` folds the
+journal back into the regular leads_data.json layout (a JSON list).
+
+Usage:
+    python3 lead_journal.py compact [db_dir]
+"""
+import os
+import sys
+import json
+import time
+import contextlib
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks on Windows; do not compact while a crawler is appending there
+    fcntl = None
+
+from file_utils import atomic_write_json, path_lock
+from lead_identity import canonical_member_id
+from lead_stream import iter_leads
+
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+
+def iter_journal(journal_path):
+    """Yield leads from a journal file, skipping a torn last line after a crash."""
+    if not os.path.exists(journal_path):
+        return
+    with open(journal_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+@contextlib.contextmanager
+def _locked(f):
+    """Exclusive lock on an open journal, shared by appending crawlers and compaction."""
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+class LeadJournal:
+    def __init__(self, journal_path, main_file_path=None, fsync_policy='interval', fsync_interval=1.0):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"fsync_policy must be one of {FSYNC_POLICIES}, got {fsync_policy!r}")
+        self.journal_path = journal_path
+        self.main_file_path = main_file_path
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._last_fsync = 0.0
+        self.known_ids = None
+
+    def _load_known_ids(self):
+        # Built once per journal so each append is an O(1) set lookup
+        ids = set()
+        if self.main_file_path and os.path.exists(self.main_file_path):
+            try:
+                ids.update(canonical_member_id(lead.get('profile_url')) for lead in iter_leads(self.main_file_path))
+            except (json.JSONDecodeError, ValueError):
+                pass
+        ids.update(canonical_member_id(lead.get('profile_url')) for lead in iter_journal(self.journal_path))
+        ids.discard(None)
+        return ids
+
+    def append(self, lead):
+        """Append a lead unless its member is already recorded. Returns True if written."""
+        if self.known_ids is None:
+            self.known_ids = self._load_known_ids()
+
+        member_id = canonical_member_id(lead.get('profile_url'))
+        if not member_id or member_id in self.known_ids:
+            return False
+
+        if self._file is None:
+            self._file = open(self.journal_path, 'a')
+            with _locked(self._file):
+                # Terminate a torn last line left by a crash, or this lead would be glued onto it
+                if not _ends_with_newline(self.journal_path):
+                    self._file.write('\n')
+                    self._file.flush()
+        with _locked(self._file):
+            self._file.write(json.dumps(lead) + '\n')
+            self._file.flush()
+        self.known_ids.add(member_id)
+
+        if self.fsync_policy == 'always':
+            os.fsync(self._file.fileno())
+        elif self.fsync_policy == 'interval':
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(self._file.fileno())
+                self._last_fsync = now
+        return True
+
+    def close(self):
+        if self._file is not None:
+            if self.fsync_policy != 'never':
+                os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+
+def compact(journal_path, main_file_path):
+    """Merge the journal into the main JSON file and truncate the journal.
+
+    The journal stays locked from the read to the truncate, so a crawler appending
+    at the same time waits instead of losing its line.
+    Returns the number of leads moved from the journal into the main file.
+    """
+    if not os.path.exists(journal_path):
+        return 0
+
+    with path_lock(main_file_path), open(journal_path, 'r+') as journal, _locked(journal):
+        existing_data = []
+        if os.path.exists(main_file_path):
+            with open(main_file_path, 'r') as f:
+                existing_data = json.load(f)
+            if not isinstance(existing_data, list):
+                existing_data = []
+
+        existing_ids = {canonical_member_id(lead.get('profile_url')) for lead in existing_data}
+        new_leads = []
+        for lead in iter_journal(journal_path):
+            member_id = canonical_member_id(lead.get('profile_url'))
+            if member_id and member_id not in existing_ids:
+                new_leads.append(lead)
+                existing_ids.add(member_id)
+
+        existing_data.extend(new_leads)
+
+        # Write through a temp file so an interrupted compaction leaves both files intact
+        atomic_write_json(main_file_path, existing_data)
+
+        journal.truncate(0)
+
+    return len(new_leads)
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] != 'compact':
+        print("Usage: python3 lead_journal.py compact [db_dir]")
+        sys.exit(1)
+
+    db_dir = sys.argv[2] if len(sys.argv) > 2 else 'db'
+    journal_path = os.path.join(db_dir, 'leads_data.jsonl')
+    main_file_path = os.path.join(db_dir, 'leads_data.json')
+
+    moved = compact(journal_path, main_file_path)
+    print(f"Compacted {moved} leads from {journal_path} into {main_file_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Durable queue between the harvest and connect stages.
+
+The harvest stage pages through a search at page speed and enqueues lead
+records; the connect stage claims them one by one, possibly from another
+account's session, and sends invites under its own pacing. The queue lives in
+the lead store's SQLite database, so it survives restarts.
+"""
+import time
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lead_queue (
+    member_id TEXT PRIMARY KEY,
+    profile_url TEXT NOT NULL,
+    name TEXT,
+    title TEXT,
+    company TEXT,
+    template TEXT,
+    search_url TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claimed_by TEXT,
+    enqueued_at REAL NOT NULL,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_lead_queue_status ON lead_queue(status, template, enqueued_at);
+"""
+
+# Claims older than this are assumed to belong to a crashed worker and are handed out again
+CLAIM_TIMEOUT = 15 * 60
+
+FINAL_STATUSES = ('done', 'skipped', 'failed')
+
+
+class LeadQueue:
+    def __init__(self, lead_store):
+        # Shares the lead store's connection and lock
+        self.conn = lead_store.conn
+        self.lock = lead_store.lock
+        with self.lock:
+            self.conn.executescript(QUEUE_SCHEMA)
+
+    def enqueue(self, records, template=None, search_url=None):
+        """Add harvested lead records. Leads already in the queue are ignored. Returns how many were added."""
+        now = time.time()
+        added = 0
+        with self.lock, self.conn:
+            for record in records:
+                cursor = self.conn.execute(
+                    """
+                    INSERT OR IGNORE INTO lead_queue
+                        (member_id, profile_url, name, title, company, template, search_url, enqueued_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (record['member_id'], record['profile_url'], record.get('name'), record.get('title'),
+                     record.get('company'), template, search_url, now)
+                )
+                added += cursor.rowcount
+        return added
+
+    def claim(self, worker=None, template=None, title_filter=None):
+        """Claim the oldest pending lead matching the filters, or return None when there is none."""
+        now = time.time()
+        query = """
+            SELECT * FROM lead_queue
+            WHERE (status = 'pending' OR (status = 'claimed' AND claimed_at < ?))
+        """
+        params = [now - CLAIM_TIMEOUT]
+        if template:
+            query += " AND template = ?"
+            params.append(template)
+        if title_filter:
+            query += " AND title LIKE ?"
+            params.append(f"%{title_filter}%")
+        query += " ORDER BY enqueued_at LIMIT 1"
+
+        with self.lock, self.conn:
+            row = self.conn.execute(query, params).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE lead_queue SET status = 'claimed', claimed_by = ?, claimed_at = ?, attempts = attempts + 1 "
+                "WHERE member_id = ?",
+                (worker, now, row['member_id'])
+            )
+        return dict(row)
+
+    def complete(self, member_id, status='done'):
+        if status not in FINAL_STATUSES:
+            raise ValueError(f"status must be one of {FINAL_STATUSES}, got {status!r}")
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE lead_queue SET status = ? WHERE member_id = ?", (status, member_id))
+
+    def release(self, member_id):
+        """Put a claimed lead back to pending, e.g. when the connect stage is stopped."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE lead_queue SET status = 'pending', claimed_by = NULL, claimed_at = NULL WHERE member_id = ?",
+                (member_id,)
+            )
+
+    def skip(self, member_ids):
+        """Mark pending leads as skipped so the connect stage never spends an invite on them."""
+        with self.lock, self.conn:
+            cursor = self.conn.executemany(
+                "UPDATE lead_queue SET status = 'skipped' WHERE member_id = ? AND status = 'pending'",
+                [(member_id,) for member_id in member_ids]
+            )
+        return cursor.rowcount
+
+    def counts(self, template=None):
+        query = "SELECT status, COUNT(*) AS count FROM lead_queue"
+        params = []
+        if template:
+            query += " WHERE template = ?"
+            params.append(template)
+        query += " GROUP BY status"
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return {row['status']: row['count'] for row in rows}
+
+    def pending(self, template=None, title_filter=None, limit=100):
+        query = "SELECT member_id, profile_url, name, title, company, template FROM lead_queue WHERE status = 'pending'"
+        params = []
+        if template:
+            query += " AND template = ?"
+            params.append(template)
+        if title_filter:
+            query += " AND title LIKE ?"
+            params.append(f"%{title_filter}%")
+        query += " ORDER BY enqueued_at LIMIT ?"
+        params.append(limit)
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
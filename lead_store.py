@@ -0,0 +1,470 @@
+"""Embedded SQLite lead store shared by the scraper, server and count scripts.
+
+Every lead is stored once, keyed by its profile, together with the template it
+was collected for and the date it was saved. Template counts and history are
+indexed queries instead of directory scans.
+
+Usage:
+    python3 lead_store.py import [--force]    # import new or changed db/ and data/ JSON files
+"""
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import threading
+
+from lead_journal import iter_journal
+from lead_identity import canonical_member_id
+from lead_stream import iter_leads
+
+DEFAULT_DB_PATH = os.path.join('db', 'leads.db')
+
+# Files in db/ that are not daily template files
+NON_LEAD_FILES = {'templates.json', 'leads_data.json', 'successful_connections.json'}
+
+DAILY_FILE_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2})-(.+)\.json$')
+SNAPSHOT_FILE_PATTERN = re.compile(r'^(.+?)(?:_(\d{4})(\d{2})(\d{2}))?\.json$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    profile_key TEXT NOT NULL UNIQUE,
+    profile_url TEXT NOT NULL,
+    name TEXT,
+    template TEXT,
+    date TEXT,
+    connection_status TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_leads_template_date ON leads(template, date);
+CREATE INDEX IF NOT EXISTS idx_leads_date ON leads(date);
+-- Lets the template-filtered export page through one template in id order without sorting
+CREATE INDEX IF NOT EXISTS idx_leads_template_id ON leads(template, id);
+CREATE TABLE IF NOT EXISTS source_files (
+    path TEXT PRIMARY KEY,
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    lead_count INTEGER NOT NULL
+);
+-- Per-template date index: one row per template and day, kept up to date by triggers
+CREATE TABLE IF NOT EXISTS template_dates (
+    template TEXT NOT NULL,
+    date TEXT NOT NULL,
+    lead_count INTEGER NOT NULL,
+    PRIMARY KEY (template, date)
+);
+CREATE TRIGGER IF NOT EXISTS trg_leads_insert AFTER INSERT ON leads WHEN NEW.template IS NOT NULL
+BEGIN
+    INSERT INTO template_dates (template, date, lead_count) VALUES (NEW.template, NEW.date, 1)
+    ON CONFLICT(template, date) DO UPDATE SET lead_count = lead_count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_leads_template AFTER UPDATE OF template ON leads
+WHEN OLD.template IS NULL AND NEW.template IS NOT NULL
+BEGIN
+    INSERT INTO template_dates (template, date, lead_count) VALUES (NEW.template, NEW.date, 1)
+    ON CONFLICT(template, date) DO UPDATE SET lead_count = lead_count + 1;
+END;
+"""
+
+# Bumped whenever existing rows need to be rewritten, see LeadStore._migrate
+SCHEMA_VERSION = 2
+
+
+def parse_lead_filename(filename, directory='db'):
+    """Return (template, date) for a lead file name, or None if it holds no leads.
+
+    db/ files are named YYYY-MM-DD-<template>.json, data/ snapshots are named
+    <template>.json or <template>_YYYYMMDD.json. Snapshot files without a date
+    return None as the date.
+    """
+    if not filename.endswith('.json'):
+        return None
+
+    if directory == 'db':
+        if filename in NON_LEAD_FILES:
+            return None
+        match = DAILY_FILE_PATTERN.match(filename)
+        if not match:
+            return None
+        return match.group(2), match.group(1)
+
+    match = SNAPSHOT_FILE_PATTERN.match(filename)
+    template = match.group(1)
+    date = f"{match.group(2)}-{match.group(3)}-{match.group(4)}" if match.group(2) else None
+    return template, date
+
+
+def profile_key(profile_url):
+    return canonical_member_id(profile_url)
+
+
+# Statuses of leads that were stored but never invited; every other non-NULL status counts as contacted
+UNCONTACTED_STATUSES = ('not_sent',)
+CONTACTED_CONDITION = f"connection_status IS NOT NULL AND connection_status NOT IN ({', '.join(repr(status) for status in UNCONTACTED_STATUSES)})"
+
+
+def is_contacted(status):
+    return status is not None and status not in UNCONTACTED_STATUSES
+
+
+def _connection_status(lead):
+    if lead.get('connection_status'):
+        return lead['connection_status']
+    if 'connection_sent' in lead:
+        return 'success' if lead['connection_sent'] else 'not_sent'
+    return None
+
+
+class LeadStore:
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        # One connection shared between the crawler threads and the server, guarded by a lock
+        self.lock = threading.RLock()
+        self.listeners = []
+        self.write_count = 0
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version < 1:
+            # Version 1 keys leads by canonical member ID instead of the raw profile URL,
+            # keeping the oldest row when several URLs point to the same member
+            with self.conn:
+                rows = self.conn.execute("SELECT id, profile_url FROM leads ORDER BY id").fetchall()
+                seen = set()
+                for row in rows:
+                    key = profile_key(row['profile_url'])
+                    if key in seen:
+                        self.conn.execute("DELETE FROM leads WHERE id = ?", (row['id'],))
+                        continue
+                    seen.add(key)
+                    # Temporary prefix avoids unique-key clashes while keys are being rewritten
+                    self.conn.execute("UPDATE leads SET profile_key = ? WHERE id = ?", (f"#{key}", row['id']))
+                self.conn.execute("UPDATE leads SET profile_key = substr(profile_key, 2)")
+        if version < 2:
+            # Version 2 adds the per-template date index, built from the existing rows
+            with self.conn:
+                self.conn.execute("DELETE FROM template_dates")
+                self.conn.execute(
+                    """
+                    INSERT INTO template_dates (template, date, lead_count)
+                    SELECT template, date, COUNT(*) FROM leads WHERE template IS NOT NULL GROUP BY template, date
+                    """
+                )
+        self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # ------------------------------
+    # Writes
+    # ------------------------------
+
+    def _insert(self, lead, template, date):
+        profile_url = lead.get('profile_url') if isinstance(lead, dict) else None
+        if not profile_url:
+            return False
+        if not date:
+            timestamp = lead.get('timestamp')
+            date = timestamp[:10] if timestamp else time.strftime('%Y-%m-%d')
+        status = _connection_status(lead)
+        cursor = self.conn.execute(
+            """
+            INSERT INTO leads (profile_key, profile_url, name, template, date, connection_status, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(profile_key) DO UPDATE SET template = excluded.template
+            WHERE leads.template IS NULL AND excluded.template IS NOT NULL
+            """,
+            (profile_key(profile_url), profile_url, lead.get('name'), template, date,
+             status, json.dumps(lead))
+        )
+        added = cursor.rowcount > 0
+        upgraded = False
+        if not added and is_contacted(status):
+            # An imported lead that was never invited has now been contacted; keep its template and date
+            upgraded = self.conn.execute(
+                f"UPDATE leads SET connection_status = ?, data = ? WHERE profile_key = ? AND NOT ({CONTACTED_CONDITION})",
+                (status, json.dumps(lead), profile_key(profile_url))
+            ).rowcount > 0
+        return added, upgraded
+
+    def add_lead(self, lead, template=None, date=None):
+        """Store a lead. Returns True if it was new (or gained a template)."""
+        return self.add_leads([lead], template, date) > 0
+
+    def add_leads(self, leads, template=None, date=None):
+        """Store several leads in one transaction. Returns how many were new."""
+        added = upgraded = 0
+        with self.lock, self.conn:
+            for lead in leads:
+                is_new, is_upgraded = self._insert(lead, template, date)
+                added += is_new
+                upgraded += is_upgraded
+            # Upgraded statuses change history responses too, so they bump the revision
+            if added or upgraded:
+                self.write_count += 1
+        if added:
+            for listener in self.listeners:
+                listener(template, added)
+        return added
+
+    def add_listener(self, listener):
+        """Call listener(template, added) after every write that stored new leads."""
+        self.listeners.append(listener)
+
+    # ------------------------------
+    # Reads
+    # ------------------------------
+
+    def count_by_template(self):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT template, COUNT(*) AS count FROM leads WHERE template IS NOT NULL GROUP BY template"
+            ).fetchall()
+        return {row['template']: row['count'] for row in rows}
+
+    def count_leads(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+
+    def iter_profile_keys(self, batch_size=10000, contacted_only=False):
+        # Read in id ranges so the lock is not held while the caller consumes keys
+        query = "SELECT id, profile_key FROM leads WHERE id > ?"
+        if contacted_only:
+            query += f" AND {CONTACTED_CONDITION}"
+        query += " ORDER BY id LIMIT ?"
+        last_id = 0
+        while True:
+            with self.lock:
+                rows = self.conn.execute(query, (last_id, batch_size)).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row['profile_key']
+            last_id = rows[-1]['id']
+
+    def has_profile_key(self, key, contacted_only=False):
+        query = "SELECT 1 FROM leads WHERE profile_key = ?"
+        if contacted_only:
+            query += f" AND {CONTACTED_CONDITION}"
+        with self.lock:
+            row = self.conn.execute(query, (key,)).fetchone()
+        return row is not None
+
+    def revision(self):
+        """Return a value that changes whenever any connection commits new leads."""
+        with self.lock:
+            # data_version only changes for commits made by other connections
+            data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+            return data_version, self.write_count
+
+    def dates_for_template(self, template, date_from=None, date_to=None, before=None, limit=None):
+        """Return (date, lead_count) pairs for a template from the date index, newest first."""
+        query = "SELECT date, lead_count FROM template_dates WHERE template = ?"
+        params = [template]
+        if date_from:
+            query += " AND date >= ?"
+            params.append(date_from)
+        if date_to:
+            query += " AND date <= ?"
+            params.append(date_to)
+        if before:
+            query += " AND date < ?"
+            params.append(before)
+        query += " ORDER BY date DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [(row['date'], row['lead_count']) for row in rows]
+
+    def get_leads(self, template, date=None):
+        query = "SELECT data FROM leads WHERE template = ?"
+        params = [template]
+        if date:
+            query += " AND date = ?"
+            params.append(date)
+        query += " ORDER BY id"
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [json.loads(row['data']) for row in rows]
+
+    def iter_export(self, template=None, date_from=None, date_to=None, statuses=None, batch_size=1000):
+        """Yield stored leads matching the filters, oldest first, one batch of rows in memory at a time.
+
+        Rows are unique per canonical member ID, so every profile is yielded once.
+        The template, date and connection status columns are merged into each lead.
+        """
+        # Each batch resumes after the last id through an index that is already in id order, so no
+        # batch re-reads or re-sorts earlier rows; the planner would otherwise pick the date index
+        query = "SELECT id, profile_key, template, date, connection_status, data FROM leads"
+        filters = []
+        if template:
+            query += " INDEXED BY idx_leads_template_id WHERE id > ? AND template = ?"
+            filters.append(template)
+        else:
+            query += " NOT INDEXED WHERE id > ?"
+        if date_from:
+            query += " AND date >= ?"
+            filters.append(date_from)
+        if date_to:
+            query += " AND date <= ?"
+            filters.append(date_to)
+        if statuses:
+            query += f" AND connection_status IN ({', '.join('?' for _ in statuses)})"
+            filters.extend(statuses)
+        query += " ORDER BY id LIMIT ?"
+
+        last_id = 0
+        while True:
+            # The lock is released between batches so crawler writes are not held up by a long export
+            with self.lock:
+                rows = self.conn.execute(query, [last_id] + filters + [batch_size]).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                lead = json.loads(row['data'])
+                lead.update(member_id=row['profile_key'], template=row['template'], date=row['date'],
+                            connection_status=row['connection_status'])
+                yield lead
+            last_id = rows[-1]['id']
+
+    def get_history(self, template, date_from=None, date_to=None, limit=None, cursor=None):
+        """Return one page of a template's history, newest day first.
+
+        Returns (history, next_cursor) where history is [{'date': ..., 'leads': [...]}]
+        for at most `limit` days and next_cursor is passed back as `cursor` to get
+        the following page, or None when there are no older days.
+        """
+        dates = self.dates_for_template(template, date_from, date_to, before=cursor,
+                                        limit=limit + 1 if limit else None)
+        next_cursor = None
+        if limit and len(dates) > limit:
+            dates = dates[:limit]
+            next_cursor = dates[-1][0]
+        if not dates:
+            return [], None
+
+        # One indexed range scan over (template, date) for the days on this page
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT date, connection_status, data FROM leads WHERE template = ? AND date BETWEEN ? AND ? ORDER BY date DESC, id",
+                (template, dates[-1][0], dates[0][0])
+            ).fetchall()
+
+        history = []
+        for row in rows:
+            if not history or history[-1]['date'] != row['date']:
+                history.append({'date': row['date'], 'leads': []})
+            lead = json.loads(row['data'])
+            # Imported history only has connection_sent; the column holds the normalized status
+            if row['connection_status']:
+                lead['connection_status'] = row['connection_status']
+            history[-1]['leads'].append(lead)
+        return history, next_cursor
+
+    # ------------------------------
+    # Import of existing JSON files
+    # ------------------------------
+
+    def import_file(self, file_path, template, date=None):
+        """Import one JSON or JSONL lead file. Returns (new_leads, leads_in_file)."""
+        # Leads are streamed into the store, the file is never loaded as a whole
+        leads = iter_journal(file_path) if file_path.endswith('.jsonl') else iter_leads(file_path)
+        lead_count = 0
+
+        def counted():
+            nonlocal lead_count
+            for lead in leads:
+                lead_count += 1
+                yield lead
+
+        imported = self.add_leads(counted(), template, date)
+        return imported, lead_count
+
+    def _import_if_changed(self, file_path, template, date=None, force=False):
+        # The manifest remembers (mtime, size) per file, so unchanged files are never re-parsed
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        with self.lock:
+            row = self.conn.execute("SELECT mtime, size FROM source_files WHERE path = ?", (path,)).fetchone()
+        if not force and row and row['mtime'] == stat.st_mtime_ns and row['size'] == stat.st_size:
+            return 0
+
+        imported, lead_count = self.import_file(path, template, date)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO source_files (path, mtime, size, lead_count) VALUES (?, ?, ?, ?)",
+                (path, stat.st_mtime_ns, stat.st_size, lead_count)
+            )
+        return imported
+
+    def _imported_before(self, file_path):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM source_files WHERE path = ?", (os.path.abspath(file_path),)
+            ).fetchone()
+        return row is not None
+
+    def import_json_files(self, db_dir='db', data_dir='data', force=False):
+        """Import daily template files, data/ snapshots and the main leads file.
+
+        Only files that are new or changed since the previous import are parsed,
+        unless force is set. The main file and journal are imported once: the
+        scraper writes every lead to the store as well, so later rewrites of
+        those files hold nothing new. Returns the number of new leads.
+        """
+        imported = 0
+        for directory, kind in ((db_dir, 'db'), (data_dir, 'data')):
+            if not os.path.exists(directory):
+                continue
+            for filename in sorted(os.listdir(directory)):
+                parsed = parse_lead_filename(filename, kind)
+                if not parsed:
+                    continue
+                template, date = parsed
+                try:
+                    imported += self._import_if_changed(os.path.join(directory, filename), template, date, force)
+                except Exception as e:
+                    print(f"Error processing {filename}: {e}")
+
+        # Main file and journal leads carry no template, import them last so templated rows win
+        for filename in ('leads_data.json', 'leads_data.jsonl'):
+            file_path = os.path.join(db_dir, filename)
+            if not os.path.exists(file_path):
+                continue
+            # Re-parsing the whole history on every rewrite would cost O(history) per start
+            if not force and self._imported_before(file_path):
+                continue
+            try:
+                imported += self._import_if_changed(file_path, None, force=force)
+            except Exception as e:
+                print(f"Error processing {filename}: {e}")
+
+        return imported
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] != 'import':
+        print("Usage: python3 lead_store.py import [--force]")
+        sys.exit(1)
+
+    store = LeadStore()
+    imported = store.import_json_files(force='--force' in sys.argv[2:])
+    store.close()
+    print(f"Imported {imported} leads into {DEFAULT_DB_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Constant-memory iteration over lead files.
+
+Walks a lead file incrementally and yields one lead at a time without building
+the whole document, so memory stays flat however large the file is. Handles
+both the db/ list layout ([...]) and the data/ layout ({"leads": [...]}).
+
+Usage:
+    python3 lead_stream.py <file.json> [...]    # print the lead count per file
+"""
+import sys
+import json
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r'
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size=None):
+        # Drop consumed text before reading more so the buffer stays small
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+        self.buf += chunk
+        return bool(chunk)
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it, or '' at EOF."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next JSON value, reading more input until it is complete."""
+        self.peek()
+        read_size = self.chunk_size
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # A value ending exactly at the buffer edge may be a truncated number
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow reads for values larger than one chunk
+            self._fill(read_size)
+            read_size *= 2
+
+
+def _iter_array(reader):
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        char = reader.peek()
+        reader.pos += 1
+        if char == ']':
+            return
+        if char != ',':
+            raise ValueError(f"Expected ',' or ']' in lead list, got {char!r}")
+
+
+def iter_leads_from_file(f, chunk_size=CHUNK_SIZE):
+    """Yield leads from an open text file in either lead file layout."""
+    reader = _Reader(f, chunk_size)
+    first = reader.peek()
+    if first == '[':
+        yield from _iter_array(reader)
+        return
+    if first != '{':
+        return
+
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if key == 'leads' and reader.peek() == '[':
+            yield from _iter_array(reader)
+            return
+        # Other top-level keys are small metadata, decode and drop them
+        reader.value()
+        char = reader.peek()
+        reader.pos += 1
+        if char == '}':
+            return
+        if char != ',':
+            raise ValueError(f"Expected ',' or '}}' in lead document, got {char!r}")
+
+
+def iter_leads(file_path, chunk_size=CHUNK_SIZE):
+    """Yield leads from a lead file without loading the whole document."""
+    with open(file_path, 'r') as f:
+        yield from iter_leads_from_file(f, chunk_size)
+
+
+def count_leads_in_file(file_path):
+    return sum(1 for _ in iter_leads(file_path))
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 lead_stream.py <file.json> [...]")
+        sys.exit(1)
+
+    for file_path in sys.argv[1:]:
+        print(f"{file_path:<50} {count_leads_in_file(file_path):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Write-behind batching for lead persistence.
+
+Leads accepted by the crawler are buffered and handed to a flush function on a
+background thread every `batch_size` leads or `flush_interval` seconds,
+whichever comes first, so the crawl loop never waits on disk.
+"""
+import time
+import threading
+
+
+class LeadWriter:
+    def __init__(self, flush_fn, batch_size=10, flush_interval=30.0, on_error=None):
+        self.flush_fn = flush_fn
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.on_error = on_error
+        self.pending = []
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.closed = False
+        self.last_flush = time.monotonic()
+        # After a failed flush the background thread waits until then before retrying
+        self.retry_after = 0.0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def add(self, lead):
+        with self.lock:
+            self.pending.append(lead)
+            if self.closed:
+                # Writer already closed (e.g. by stop()), persist synchronously
+                flush_now = True
+            else:
+                flush_now = False
+                if len(self.pending) >= self.batch_size:
+                    self.wakeup.notify()
+        if flush_now:
+            self.flush()
+
+    def flush(self):
+        """Persist all pending leads now. Returns the number of leads flushed."""
+        with self.flush_lock:
+            with self.lock:
+                batch, self.pending = self.pending, []
+                self.last_flush = time.monotonic()
+            if not batch:
+                return 0
+            try:
+                self.flush_fn(batch)
+            except Exception as e:
+                # Keep the batch so a later flush can retry it
+                with self.lock:
+                    self.pending = batch + self.pending
+                    self.retry_after = time.monotonic() + max(self.flush_interval, 1.0)
+                if self.on_error:
+                    self.on_error(e)
+                return 0
+            with self.lock:
+                self.retry_after = 0.0
+            return len(batch)
+
+    def _run(self):
+        while True:
+            with self.lock:
+                while not self.closed:
+                    now = time.monotonic()
+                    if now < self.retry_after:
+                        # A full batch must not retry a failing flush in a tight loop
+                        self.wakeup.wait(self.retry_after - now)
+                        continue
+                    if len(self.pending) >= self.batch_size:
+                        break
+                    remaining = self.flush_interval - (now - self.last_flush)
+                    if remaining <= 0:
+                        break
+                    self.wakeup.wait(remaining)
+                if self.closed:
+                    return
+            self.flush()
+
+    def close(self):
+        """Stop the background thread and flush everything still pending."""
+        with self.lock:
+            self.closed = True
+            self.wakeup.notify()
+        if self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join()
+        return self.flush()
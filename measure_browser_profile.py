@@ -0,0 +1,101 @@
+"""Compare memory and page-load time of the 'full' and 'lean' browser profiles.
+
+Usage:
+    python3 measure_browser_profile.py [url] [runs]
+
+Launches one Chrome per profile, loads the URL `runs` times and reports the
+resident memory of the whole browser process tree (browser, renderers, GPU and
+utility processes) together with page-load times. The last column estimates
+how many concurrent sessions fit in this machine's RAM.
+"""
+import os
+import sys
+import time
+import statistics
+import subprocess
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+from browser_profile import PROFILES, build_options, apply_resource_blocking, cache_dir_for
+from driver_pool import resolve_chromedriver, quit_driver
+
+DEFAULT_URL = 'https://www.linkedin.com/sales/login'
+
+NAVIGATION_TIMING_SCRIPT = """
+const entry = performance.getEntriesByType('navigation')[0];
+return entry ? {dom_content_loaded: entry.domContentLoadedEventEnd, load: entry.loadEventEnd} : null;
+"""
+
+
+def process_tree_rss(root_pid):
+    """Resident memory in bytes of a process and all of its descendants."""
+    output = subprocess.run(['ps', '-A', '-o', 'pid=,ppid=,rss='], capture_output=True, text=True).stdout
+    children = {}
+    rss = {}
+    for line in output.splitlines():
+        pid, ppid, kilobytes = (int(value) for value in line.split())
+        children.setdefault(ppid, []).append(pid)
+        rss[pid] = kilobytes * 1024
+
+    total = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        total += rss.get(pid, 0)
+        pending.extend(children.get(pid, []))
+    return total
+
+
+def total_memory():
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def measure(profile, url, runs):
+    driver = webdriver.Chrome(
+        service=Service(resolve_chromedriver()),
+        options=build_options(profile, cache_dir_for('benchmark'))
+    )
+    try:
+        if profile == 'lean':
+            apply_resource_blocking(driver)
+
+        load_times = []
+        peak_rss = 0
+        for _ in range(runs):
+            started = time.perf_counter()
+            driver.get(url)
+            wall = time.perf_counter() - started
+            timing = driver.execute_script(NAVIGATION_TIMING_SCRIPT)
+            load_times.append(timing['load'] / 1000 if timing and timing['load'] else wall)
+            # chromedriver is the parent of the Chrome process tree
+            peak_rss = max(peak_rss, process_tree_rss(driver.service.process.pid))
+        return {
+            'profile': profile,
+            'peak_rss_mb': peak_rss / (1024 * 1024),
+            'load_median_s': statistics.median(load_times),
+            'load_max_s': max(load_times),
+        }
+    finally:
+        quit_driver(driver)
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_URL
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    memory = total_memory()
+
+    print(f"{url} ({runs} loads per profile)")
+    print(f"{'profile':<8} {'peak RSS':>10} {'median load':>12} {'max load':>9} {'sessions/node':>14}")
+    for profile in PROFILES:
+        result = measure(profile, url, runs)
+        sessions = int(memory * 0.8 // (result['peak_rss_mb'] * 1024 * 1024)) if memory else '-'
+        print(f"{profile:<8} {result['peak_rss_mb']:>8.0f}MB {result['load_median_s']:>11.2f}s "
+              f"{result['load_max_s']:>8.2f}s {sessions:>14}")
+
+
+if __name__ == '__main__':
+    main()
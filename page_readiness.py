@@ -0,0 +1,124 @@
+"""Condition-based waits for Sales Navigator pages.
+
+Instead of fixed sleeps, waits poll the page with one injected script and
+return as soon as the page is actually ready: the document has loaded, no
+network response finished and no DOM mutation happened for a short quiet
+window, and the number of rendered lead cards stopped changing. Every wait has
+an upper bound. Human-like pauses are a separate, optional policy.
+"""
+import time
+import random
+
+# Installs a MutationObserver once per document and reports page activity in one round-trip
+PROBE_SCRIPT = """
+if (!window.__readiness) {
+    window.__readiness = {lastMutation: performance.now()};
+    new MutationObserver(function() {
+        window.__readiness.lastMutation = performance.now();
+    }).observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+    performance.setResourceTimingBufferSize(5000);
+}
+const now = performance.now();
+const resources = performance.getEntriesByType('resource');
+const lastResponse = resources.reduce(function(last, entry) { return Math.max(last, entry.responseEnd); }, 0);
+const container = arguments[0] ? document.getElementById(arguments[0]) : null;
+return {
+    ready_state: document.readyState,
+    since_mutation: (now - window.__readiness.lastMutation) / 1000,
+    since_network: (now - lastResponse) / 1000,
+    card_count: container ? container.querySelectorAll(arguments[1]).length : 0,
+    scroll_top: container ? container.scrollTop : 0,
+    scroll_height: container ? container.scrollHeight : 0,
+    client_height: container ? container.clientHeight : 0
+};
+"""
+
+LEAD_NAME_SELECTOR = '[data-view-name="search-results-lead-name"]'
+
+
+class PageReadiness:
+    def __init__(self, driver, timeout=15, poll_interval=0.2, quiet_window=0.5, stable_polls=3):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.quiet_window = quiet_window
+        self.stable_polls = stable_polls
+
+    def probe(self, container_id=None, card_selector=LEAD_NAME_SELECTOR):
+        return self.driver.execute_script(PROBE_SCRIPT, container_id, card_selector)
+
+    def _is_quiet(self, state):
+        return (state['ready_state'] == 'complete'
+                and state['since_mutation'] >= self.quiet_window
+                and state['since_network'] >= self.quiet_window)
+
+    def wait_until(self, condition, container_id=None, timeout=None):
+        """Poll until condition(state) is true. Returns the last state; never waits past the timeout."""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        while True:
+            try:
+                state = self.probe(container_id)
+            except Exception:
+                # The document may be mid-navigation, try again on the next poll
+                state = None
+            if state and condition(state):
+                return state
+            if time.monotonic() >= deadline:
+                return state
+            time.sleep(self.poll_interval)
+
+    def wait_for_page_ready(self, timeout=None):
+        """Wait for the document to load and for network and DOM activity to settle."""
+        return self.wait_until(self._is_quiet, timeout=timeout)
+
+    def wait_for_cards_stable(self, container_id, timeout=None):
+        """Wait until the rendered lead card count stops changing and the DOM is quiet."""
+        history = []
+
+        def stable(state):
+            history.append(state['card_count'])
+            recent = history[-self.stable_polls:]
+            return (len(recent) == self.stable_polls and len(set(recent)) == 1
+                    and state['since_mutation'] >= self.quiet_window)
+
+        return self.wait_until(stable, container_id, timeout)
+
+    def scroll_until_loaded(self, container_id, max_steps=40):
+        """Scroll the results container one viewport at a time until every card has rendered.
+
+        Each step waits only until the cards revealed by that step are in place.
+        Returns the number of rendered cards.
+        """
+        state = self.wait_for_cards_stable(container_id) or {}
+        for _ in range(max_steps):
+            if state.get('scroll_top', 0) + state.get('client_height', 0) >= state.get('scroll_height', 0):
+                break
+            self.driver.execute_script(
+                "const c = document.getElementById(arguments[0]); c.scrollTop = c.scrollTop + c.clientHeight;",
+                container_id
+            )
+            state = self.wait_for_cards_stable(container_id) or state
+        return state.get('card_count', 0)
+
+    def wait_for_results_change(self, old_element, container_id, timeout=None):
+        """After clicking Next, wait for the old results to be replaced and the new ones to settle."""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        while time.monotonic() < deadline:
+            try:
+                old_element.is_enabled()
+            except Exception:
+                # Stale element: the result list was re-rendered
+                break
+            time.sleep(self.poll_interval)
+        return self.wait_for_cards_stable(container_id, max(0.1, deadline - time.monotonic()))
+
+
+class HumanPacing:
+    """Optional random pauses on top of readiness waits, to keep a human-like rhythm."""
+
+    def __init__(self, min_delay=0.5, max_delay=1.5):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+
+    def pause(self):
+        time.sleep(random.uniform(self.min_delay, self.max_delay))
@@ -0,0 +1,155 @@
+"""Fan-out bus for crawler progress events.
+
+Each job keeps its recent events in a bounded ring buffer and numbers them, so
+any number of browser tabs can follow the same job. A tab that reconnects with
+Last-Event-ID gets exactly the events it missed, as long as they are still in
+the buffer. A job nobody watches holds at most `buffer_size` events, and
+channels of finished jobs are dropped after `retention` seconds.
+"""
+import time
+import asyncio
+import threading
+from collections import deque
+
+
+class JobChannel:
+    def __init__(self, buffer_size):
+        self.events = deque(maxlen=buffer_size)
+        self.next_id = 1
+        self.closed_at = None
+        self.cond = threading.Condition()
+        # (event loop, asyncio.Event) pairs of async subscribers waiting for the next event
+        self.async_waiters = set()
+
+    def notify(self):
+        # Caller holds self.cond
+        self.cond.notify_all()
+        for loop, wakeup in list(self.async_waiters):
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # The subscriber's event loop has already shut down
+                self.async_waiters.discard((loop, wakeup))
+
+    def after(self, last_id):
+        """Events newer than last_id, and how many of them already fell out of the buffer."""
+        events = [event for event in self.events if event['id'] > last_id]
+        first_id = events[0]['id'] if events else self.next_id
+        return events, max(0, first_id - last_id - 1)
+
+
+class ChannelPublisher:
+    """Queue-like handle for one job, so the scraper can keep calling .put(progress)."""
+
+    def __init__(self, bus, job_id):
+        self.bus = bus
+        self.job_id = job_id
+
+    def put(self, event):
+        self.bus.publish(self.job_id, event)
+
+
+class ProgressBus:
+    def __init__(self, buffer_size=500, retention=10 * 60):
+        self.buffer_size = buffer_size
+        self.retention = retention
+        self.lock = threading.Lock()
+        self.channels = {}
+
+    def open(self, job_id):
+        self._prune()
+        with self.lock:
+            channel = self.channels.get(job_id)
+            if channel is None:
+                channel = self.channels[job_id] = JobChannel(self.buffer_size)
+            return channel
+
+    def get(self, job_id):
+        with self.lock:
+            return self.channels.get(job_id)
+
+    def publisher(self, job_id):
+        self.open(job_id)
+        return ChannelPublisher(self, job_id)
+
+    def publish(self, job_id, event):
+        """Number the event, buffer it and wake every subscriber. Returns the event ID."""
+        channel = self.open(job_id)
+        with channel.cond:
+            event = dict(event, id=channel.next_id)
+            channel.next_id += 1
+            channel.events.append(event)
+            channel.notify()
+        return event['id']
+
+    def close(self, job_id):
+        """Mark the job finished; subscribers end once they have read the remaining events."""
+        channel = self.get(job_id)
+        if channel is None:
+            return
+        with channel.cond:
+            channel.closed_at = time.monotonic()
+            channel.notify()
+
+    def wait_for_events(self, job_id, last_id=0, timeout=15.0, coalesce=0.25):
+        """Block until there are events after last_id, the job is closed, or the timeout passes.
+
+        Once the first new event arrives, waits another `coalesce` seconds so a
+        burst of messages is returned, and sent, as one batch.
+        Returns (events, dropped, closed); closed is only true when there is nothing left to read.
+        """
+        channel = self.get(job_id)
+        if channel is None:
+            return [], 0, True
+
+        with channel.cond:
+            channel.cond.wait_for(
+                lambda: channel.next_id - 1 > last_id or channel.closed_at is not None, timeout
+            )
+            has_new = channel.next_id - 1 > last_id
+
+        if has_new and coalesce and channel.closed_at is None:
+            time.sleep(coalesce)
+
+        with channel.cond:
+            events, dropped = channel.after(last_id)
+            closed = channel.closed_at is not None and not events
+        return events, dropped, closed
+
+    async def wait_for_events_async(self, job_id, last_id=0, timeout=15.0, coalesce=0.25):
+        """Same as wait_for_events, but waits on the event loop instead of blocking a thread."""
+        channel = self.get(job_id)
+        if channel is None:
+            return [], 0, True
+
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with channel.cond:
+            ready = channel.next_id - 1 > last_id or channel.closed_at is not None
+            if not ready:
+                channel.async_waiters.add(waiter)
+        try:
+            if not ready:
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with channel.cond:
+                channel.async_waiters.discard(waiter)
+                has_new = channel.next_id - 1 > last_id
+
+        if has_new and coalesce and channel.closed_at is None:
+            await asyncio.sleep(coalesce)
+
+        with channel.cond:
+            events, dropped = channel.after(last_id)
+            closed = channel.closed_at is not None and not events
+        return events, dropped, closed
+
+    def _prune(self):
+        now = time.monotonic()
+        with self.lock:
+            expired = [job_id for job_id, channel in self.channels.items()
+                       if channel.closed_at is not None and now - channel.closed_at > self.retention]
+            for job_id in expired:
+                del self.channels[job_id]
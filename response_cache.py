@@ -0,0 +1,29 @@
+"""Small thread-safe LRU cache for serialized API responses."""
+import threading
+from collections import OrderedDict
+
+
+class ResponseCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key, revision):
+        """Return the cached value for key, or None if missing or built for another revision."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != revision:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, revision, value):
+        with self.lock:
+            self.entries[key] = (revision, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
@@ -6,15 +6,37 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 import time
 import random
-import json
-import urllib.parse
 import logging
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
+from lead_journal import LeadJournal
+from lead_store import LeadStore
+from lead_writer import LeadWriter
+from file_utils import atomic_write_json, load_json_list, path_lock
+from lead_identity import canonical_member_id, SeenLeadIndex
+from driver_pool import resolve_chromedriver
+from browser_profile import build_options, apply_resource_blocking, cache_dir_for
+from session_store import SessionStore
+from page_readiness import PageReadiness, HumanPacing
+from card_extraction import extract_cards
+from lead_queue import LeadQueue
+from crawl_checkpoint import CheckpointStore, with_page
+from action_scheduler import ActionScheduler
+from crawl_metrics import JobMetrics, timed
+from crawl_logging import configure_logging, format_timestamp, LEAD_LOG_FIELDS
+from input_strategies import make_input_strategy, PerCharacterTyping
+
+DB_DIR = '/Users/dani/Documents/web/linkedin-crawler/db'
+
+# Returned by _send_connection when the job stopped or ran out of action budget before the invite was sent
+NOT_ATTEMPTED = object()
 
 class SalesNavigatorScraper:
-    def __init__(self, email, password, connect_note=None, progress_queue=None, template_name=None, lead_limit=None):
+    def __init__(self, email, password, connect_note=None, progress_queue=None, template_name=None, lead_limit=None,
+                 storage_mode='json', fsync_policy='interval', lead_store=None,
+                 flush_every=10, flush_interval=30.0, seen_leads=None, driver_pool=None,
+                 session_store=None, readiness_timeout=15, human_pacing=None, lead_queue=None,
+                 browser_profile='full', action_scheduler=None, metrics=None, job_id=None,
+                 note_input='bulk', login_input='chunked'):
         self.email = email
         self.password = password
         self.driver = None
@@ -23,54 +45,161 @@ class SalesNavigatorScraper:
         self.progress_queue = progress_queue
         self.template_name = template_name
         self.lead_limit = lead_limit  # Add lead limit parameter
+        # 'json' rewrites leads_data.json on every save, 'journal' appends to leads_data.jsonl
+        self.storage_mode = storage_mode
+        self.fsync_policy = fsync_policy
+        self.journal = None
+        self.lead_store = lead_store
+        # Member IDs of leads that were already contacted, shared between jobs when given
+        self.seen_leads = seen_leads
+        # Warm browser sessions shared between jobs, see driver_pool.DriverPool
+        self.driver_pool = driver_pool
+        # Saved cookies/localStorage per account, restored instead of logging in again
+        # Without an explicit store, sessions live next to the lead store's database
+        if session_store is None:
+            db_dir = os.path.dirname(lead_store.db_path) if lead_store else DB_DIR
+            session_store = SessionStore(os.path.join(db_dir, 'sessions'))
+        self.session_store = session_store
+        # True while this browser runs on cookies restored from the session store
+        self.session_restored = False
+        # Upper bound for every readiness wait; human_pacing adds optional random pauses on top
+        self.readiness_timeout = readiness_timeout
+        self.human_pacing = HumanPacing(*human_pacing) if isinstance(human_pacing, (tuple, list)) else human_pacing
+        self._readiness = None
+        # Durable queue between the harvest and connect stages, see lead_queue.LeadQueue
+        self.lead_queue = lead_queue
+        # 'full' is a headed, maximized Chrome; 'lean' runs headless without images, fonts and media
+        self.browser_profile = browser_profile
+        # Leads saved by earlier runs of a resumed search, so lead_limit keeps counting from there
+        self.lead_count_offset = 0
+        # Last lead card handled on the current page, stored in the crawl checkpoint
+        self.last_member_id = None
+        self.checkpoints = None
+        # Paces page views, connects and note sends for this account, see action_scheduler.py
+        self.action_scheduler = action_scheduler
+        # Per-phase timers and counters, also aggregated for /metrics
+        self.metrics = metrics or JobMetrics()
+        # How the note and login fields are filled: 'bulk', 'chunked' or 'per_char', see input_strategies.py
+        self.note_input = make_input_strategy(note_input)
+        self.login_input = make_input_strategy(login_input)
+        # Added to every structured log record of this run
+        self.log_context = {'job_id': job_id, 'account': email, 'template': template_name}
         self.setup_logging()
+        # Accepted leads are persisted in batches on a background thread
+        self.lead_writer = LeadWriter(
+            self._persist_leads,
+            batch_size=flush_every,
+            flush_interval=flush_interval,
+            on_error=self._report_save_error
+        )
         self.is_running = True
 
     def setup_logging(self):
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('linkedin_scraper.log'),
-                logging.StreamHandler()
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
+        # Shared, non-blocking pipeline: records are written by a background listener, see crawl_logging.py
+        self.logger = configure_logging().getChild('scraper')
 
     def report_progress(self, message, status='info', data=None):
+        now = time.time()
         if self.progress_queue:
             progress = {
                 'message': message,
                 'status': status,
                 'data': data,
-                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+                'timestamp': format_timestamp(now)
             }
             self.progress_queue.put(progress)
-        self.logger.info(message)
+
+        level = logging.ERROR if status == 'error' else logging.INFO
+        if self.logger.isEnabledFor(level):
+            context = dict(self.log_context, status=status)
+            if isinstance(data, dict):
+                context['lead'] = {field: data[field] for field in LEAD_LOG_FIELDS if field in data}
+            self.logger.log(level, message, extra={'context': context})
 
     # --- INI ADALAH FUNGSI setup_driver YANG SUDAH DIPERBAIKI ---
+    @timed('setup_driver')
     def setup_driver(self):
-        """Menginisialisasi WebDriver menggunakan webdriver-manager untuk mengunduh driver yang kompatibel."""
+        """Menginisialisasi WebDriver, memakai sesi browser dari pool jika tersedia."""
         try:
-            # Menggunakan opsi dari kode Anda sebelumnya, yang baik untuk menghindari deteksi
-            options = Options()
-            options.add_argument('--start-maximized')
-            options.add_argument('--disable-blink-features=AutomationControlled')
-            options.add_experimental_option('excludeSwitches', ['enable-automation'])
-            options.add_experimental_option('useAutomationExtension', False)
+            # Reuse a warm, already logged-in session for this account when the pool has one
+            if self.driver_pool:
+                driver = self.driver_pool.checkout(self.email, self.browser_profile)
+                if driver:
+                    self.driver = driver
+                    self.report_progress("Menggunakan sesi browser yang sudah berjalan", 'success')
+                    return True
+
+            # Opsi anti-deteksi yang sama untuk kedua profil; 'lean' menambah headless dan batas memori
+            options = build_options(self.browser_profile, cache_dir_for(self.email))
             
-            # Baris di bawah ini adalah perbaikan utamanya!
-            # Ini akan secara otomatis mengunduh dan mengatur ChromeDriver yang benar.
-            service = Service(ChromeDriverManager().install())
+            # Path ChromeDriver di-cache di disk, jadi hanya sesekali perlu akses jaringan
+            service = Service(resolve_chromedriver())
             
+            # Idle sessions count against the browser limit; make room before launching another
+            if self.driver_pool:
+                self.driver_pool.reserve(self.email)
+
             # Menginisialisasi driver dengan service yang sudah diatur
-            self.driver = webdriver.Chrome(service=service, options=options)
+            try:
+                self.driver = webdriver.Chrome(service=service, options=options)
+            except Exception:
+                if self.driver_pool:
+                    self.driver_pool.unreserve()
+                raise
+            
+            if self.browser_profile == 'lean':
+                apply_resource_blocking(self.driver)
+            
+            # Restore the saved login so the search URL opens without the login form
+            try:
+                if self.session_store.restore(self.email, self.driver):
+                    self.session_restored = True
+                    self.report_progress("Sesi login tersimpan dipulihkan")
+            except Exception as e:
+                self.report_progress(f"Gagal memulihkan sesi login: {str(e)}", 'error')
             
             self.report_progress("Driver berhasil diatur!", 'success')
             return True
         except Exception as e:
             self.report_progress(f"Gagal mengatur driver: {str(e)}", 'error')
             return False
+
+    @property
+    def readiness(self):
+        # Bound to the current driver, which changes when a session is checked out of the pool
+        if self._readiness is None or self._readiness.driver is not self.driver:
+            self._readiness = PageReadiness(self.driver, timeout=self.readiness_timeout)
+        return self._readiness
+
+    def wait_for_page(self):
+        """Menunggu halaman siap (dokumen, jaringan, dan DOM tenang), lalu jeda opsional."""
+        self.readiness.wait_for_page_ready()
+        self.pace()
+
+    def pace(self):
+        if self.human_pacing:
+            self.human_pacing.pause()
+
+    def release_driver(self):
+        """Mengembalikan sesi browser ke pool, atau menutupnya jika tidak ada pool."""
+        driver, self.driver = self.driver, None
+        if not driver:
+            return
+        if self.driver_pool:
+            self.driver_pool.release(self.email, driver, self.browser_profile)
+        else:
+            driver.quit()
+
+    def warm_up_session(self):
+        """Membuka browser dan login, lalu menyimpan sesinya di pool untuk job berikutnya."""
+        try:
+            if not self.setup_driver():
+                return False
+            self.login_to_sales_navigator()
+            return True
+        finally:
+            self.close_storage()
+            self.release_driver()
     # --- AKHIR FUNGSI setup_driver YANG SUDAH DIPERBAIKI ---
     
     def direct_access_and_connect(self, search_url, action='connect'):
@@ -118,9 +247,10 @@ class SalesNavigatorScraper:
             if self.driver:
                 self.driver.quit()
 
+    @timed('login')
     def login_to_sales_navigator(self):
         self.driver.get('https://www.linkedin.com/sales')
-        time.sleep(random.uniform(2, 4))
+        self.wait_for_page()
         
         # Check if already logged in by looking for common Sales Navigator elements
         try:
@@ -131,24 +261,65 @@ class SalesNavigatorScraper:
             return
         except TimeoutException:
             self.report_progress("Tidak ada sesi aktif yang ditemukan, melanjutkan dengan login")
+            if self.session_restored:
+                # The restored cookies are stale; drop them so the next start does not load them again
+                self.session_restored = False
+                try:
+                    self.session_store.discard(self.email)
+                    self.report_progress("Sesi login tersimpan sudah tidak berlaku dan dihapus")
+                except OSError as e:
+                    self.report_progress(f"Gagal menghapus sesi login lama: {str(e)}", 'error')
             
         # Proceed with login if needed
         self.driver.get('https://www.linkedin.com/login')
-        time.sleep(random.uniform(2, 4))
         
-        email_field = self.driver.find_element(By.ID, 'username')
+        email_field = WebDriverWait(self.driver, self.readiness_timeout).until(
+            EC.presence_of_element_located((By.ID, 'username'))
+        )
+        self.pace()
         password_field = self.driver.find_element(By.ID, 'password')
         
-        self.type_like_human(email_field, self.email)
-        self.type_like_human(password_field, self.password)
+        self.enter_text(email_field, self.email, self.login_input, 'email')
+        self.enter_text(password_field, self.password, self.login_input, 'password', secret=True)
         
         password_field.submit()
-        time.sleep(5)
+
+        # Wait until LinkedIn leaves the login page, then keep the session for the next run
+        try:
+            WebDriverWait(self.driver, 15).until(
+                lambda driver: '/login' not in driver.current_url and '/checkpoint' not in driver.current_url
+            )
+        except TimeoutException:
+            self.report_progress("Login belum selesai (mungkin perlu verifikasi), sesi tidak disimpan", 'error')
+            return
+
+        try:
+            self.session_store.save(self.email, self.driver)
+            self.report_progress("Sesi login disimpan untuk run berikutnya", 'success')
+        except Exception as e:
+            self.report_progress(f"Gagal menyimpan sesi login: {str(e)}", 'error')
         
     def type_like_human(self, element, text):
-        for char in text:
-            element.send_keys(char)
-            time.sleep(random.uniform(0.05, 0.15)) 
+        PerCharacterTyping().enter(element, text)
+
+    def enter_text(self, element, text, strategy, field, secret=False):
+        """Mengisi field dengan strategi input yang dipilih dan melaporkan durasinya.
+
+        Untuk field rahasia (password) panjang teks dan jumlah panggilan tidak dilaporkan.
+        """
+        stats = strategy.enter(element, text)
+        self.metrics.observe(f"input_{stats['strategy']}", stats['seconds'])
+        reported = dict(stats, field=field)
+        if secret:
+            # Progress events go to the browser and the log; the length of a secret must not
+            reported.pop('chars')
+            reported.pop('round_trips')
+            message = f"Field {field} diisi ({stats['strategy']}, {stats['seconds']:.1f} detik)"
+        else:
+            message = (f"Field {field} diisi ({stats['strategy']}, {stats['chars']} karakter, "
+                       f"{stats['round_trips']} panggilan, {stats['seconds']:.1f} detik)")
+        self.report_progress(message, 'info', {'input': reported})
+        return stats
 
     def scrape_search_results(self, search_url):
         try:
@@ -160,7 +331,7 @@ class SalesNavigatorScraper:
             
             # Navigate to the search URL
             self.driver.get(search_url)
-            time.sleep(random.uniform(3, 5))
+            self.wait_for_page()
             
             page = 1
             while True:
@@ -179,278 +350,555 @@ class SalesNavigatorScraper:
                     if not next_button.is_enabled():
                         break
                     next_button.click()
-                    time.sleep(random.uniform(3, 5))
+                    self.wait_for_page()
                     page += 1
                 except:
                     break
                     
         finally:
-            self.driver.quit()
+            self.close_storage()
+            self.release_driver()
             
+    @timed('save_leads')
     def save_leads_to_file(self):
+        """Menyimpan semua leads yang masih tertunda secara langsung."""
+        self.lead_writer.flush()
+
+    @timed('persist_leads')
+    def _persist_leads(self, leads):
+        # Called by the lead writer with a batch of accepted leads.
+        # The lead store is authoritative: a failure here makes the writer retry the batch
+        self._save_to_lead_store(leads)
+
+        # The legacy leads_data.json / journal must not block or repeat the store write
         try:
-            # Create db directory if it doesn't exist
-            os.makedirs(os.path.join('/Users/dani/Documents/web/linkedin-crawler/db'), exist_ok=True)
-            
-            # Save to main leads_data.json
-            self._save_to_main_file()
-            
-            # Save to daily template file if template name is provided
-            if self.template_name:
-                self._save_to_daily_template_file()
-                
+            os.makedirs(self._db_dir(), exist_ok=True)
+            self._save_to_main_file(leads)
         except Exception as e:
-            self.report_progress(f"Error menyimpan leads ke file: {str(e)}", 'error')
-            
-    def _save_to_main_file(self):
-        try:
-            main_file_path = os.path.join('/Users/dani/Documents/web/linkedin-crawler/db', 'leads_data.json')
-            
-            # Load existing data if file exists
-            existing_data = []
-            if os.path.exists(main_file_path):
-                try:
-                    with open(main_file_path, 'r') as f:
-                        existing_data = json.load(f)
-                except json.JSONDecodeError:
-                    existing_data = []
-            
-            # Create a set of existing profile URLs to check for duplicates
-            existing_urls = {lead.get('profile_url') for lead in existing_data if lead.get('profile_url')}
+            self.report_progress(f"Error menyimpan leads ke file utama: {str(e)}", 'error')
+
+    def _report_save_error(self, error):
+        self.report_progress(f"Error menyimpan leads ke file: {str(error)}", 'error')
             
+    def _save_to_main_file(self, leads):
+        if self.storage_mode == 'journal':
+            self._append_to_journal(leads)
+            return
+
+        main_file_path = os.path.join(self._db_dir(), 'leads_data.json')
+
+        # Jobs running at the same time share the main file; load and rewrite it under one lock
+        with path_lock(main_file_path):
+            # Load existing data; a corrupt file is moved aside instead of being overwritten
+            existing_data = load_json_list(main_file_path)
+
+            # Create a set of existing member IDs to check for duplicates
+            existing_ids = {canonical_member_id(lead.get('profile_url')) for lead in existing_data}
+
             # Only add new leads that don't exist in the file
             new_leads = []
-            for lead in self.leads_data:
-                if lead.get('profile_url') and lead['profile_url'] not in existing_urls:
+            for lead in leads:
+                member_id = canonical_member_id(lead.get('profile_url'))
+                if member_id and member_id not in existing_ids:
                     new_leads.append(lead)
-                    existing_urls.add(lead['profile_url'])
-            
+                    existing_ids.add(member_id)
+
             # Merge only new leads with existing data
-            if isinstance(existing_data, list):
-                existing_data.extend(new_leads)
-            else:
-                existing_data = new_leads
-            
-            # Write the combined data back to file
-            with open(main_file_path, 'w') as f:
-                json.dump(existing_data, f, indent=2)
-                f.flush()
-                
-            self.report_progress(f"Berhasil menyimpan {len(new_leads)} leads baru ke file utama", 'success')
+            existing_data.extend(new_leads)
+
+            # Write the combined data through a temp file so a crash cannot truncate it
+            atomic_write_json(main_file_path, existing_data)
             
-        except Exception as e:
-            self.report_progress(f"Error saat menyimpan ke file utama: {str(e)}", 'error')
+        self.report_progress(f"Berhasil menyimpan {len(new_leads)} leads baru ke file utama", 'success')
             
-    def _save_to_daily_template_file(self):
+    def _append_to_journal(self, leads):
+        if self.journal is None:
+            self.journal = LeadJournal(
+                os.path.join(self._db_dir(), 'leads_data.jsonl'),
+                main_file_path=os.path.join(self._db_dir(), 'leads_data.json'),
+                fsync_policy=self.fsync_policy
+            )
+
+        written = sum(1 for lead in leads if self.journal.append(lead))
+
+        self.report_progress(f"Berhasil menyimpan {written} leads baru ke journal", 'success')
+
+    def close_storage(self):
+        """Menyimpan leads yang tertunda lalu menutup journal."""
+        self.lead_writer.close()
+        if self.journal:
+            try:
+                self.journal.close()
+            except Exception as e:
+                self.report_progress(f"Error menutup journal: {str(e)}", 'error')
+            self.journal = None
+
+    def _get_lead_store(self):
+        if self.lead_store is None:
+            self.lead_store = LeadStore(os.path.join(DB_DIR, 'leads.db'))
+        return self.lead_store
+
+    def _db_dir(self):
+        # Legacy lead files live next to the lead store's database
+        return os.path.dirname(self._get_lead_store().db_path) or '.'
+
+    def _load_seen_leads(self):
+        # Built once from every stored lead, later checks are in-memory lookups
+        if self.seen_leads is None:
+            self.seen_leads = SeenLeadIndex(self._get_lead_store())
+            self.report_progress("Indeks lead yang sudah diproses dimuat")
+
+    def _save_to_lead_store(self, leads):
+        self._get_lead_store()
+        stored = self.lead_store.add_leads(leads, self.template_name, time.strftime('%Y-%m-%d'))
+
+        self.report_progress(f"Berhasil menyimpan {stored} leads baru ke database template", 'success')
+    
+    def _get_action_scheduler(self):
+        if self.action_scheduler is None:
+            self.action_scheduler = ActionScheduler(self.email, self._get_lead_store())
+        return self.action_scheduler
+
+    def _throttle(self, action):
+        """Menunggu kuota aksi. False jika batas harian/mingguan tercapai atau crawler dihentikan."""
+        scheduler = self._get_action_scheduler()
+        wait = scheduler.wait_time(action)
+        if wait >= 5:
+            self.report_progress(f"Menunggu kuota '{action}' selama {wait:.0f} detik")
+        with self.metrics.timer(f'throttle_{action}'):
+            acquired = scheduler.acquire(action, lambda: self.is_running)
+        if acquired:
+            return True
+        if self.is_running:
+            self.report_progress(f"Batas harian/mingguan untuk '{action}' tercapai. Menghentikan crawler...", 'info')
+            self.is_running = False
+        return False
+
+    def _open_search(self, search_url):
+        if not self._throttle('page_view'):
+            return
+        # Try to access the search URL directly
+        self.driver.get(search_url)
+        self.wait_for_page()
+
+        # Check if we need to login
+        if "login" in self.driver.current_url.lower():
+            print("Login diperlukan, melanjutkan dengan login...")
+            self.login_to_sales_navigator()
+            # After login, navigate back to search URL
+            if not self._throttle('page_view'):
+                return
+            self.driver.get(search_url)
+            self.wait_for_page()
+
+    def _go_to_next_page(self, page):
+        """Klik tombol Next dan tunggu hasil baru. False di halaman terakhir, None jika Next tidak bisa diklik."""
         try:
-            # Generate daily template filename in db folder
-            today = time.strftime('%Y-%m-%d')
-            daily_filename = os.path.join('/Users/dani/Documents/web/linkedin-crawler/db', f'{today}-{self.template_name}.json')
-            
-            # Load existing daily data if file exists
-            daily_data = []
-            if os.path.exists(daily_filename):
-                try:
-                    with open(daily_filename, 'r') as f:
-                        daily_data = json.load(f)
-                except json.JSONDecodeError:
-                    daily_data = []
-            
-            # Create a set of existing profile URLs for the day
-            daily_urls = {lead.get('profile_url') for lead in daily_data if lead.get('profile_url')}
-            
-            # Only add new leads that don't exist in today's file
-            new_daily_leads = []
-            for lead in self.leads_data:
-                if lead.get('profile_url') and lead['profile_url'] not in daily_urls:
-                    new_daily_leads.append(lead)
-                    daily_urls.add(lead['profile_url'])
-            
-            # Merge new leads with existing daily data
-            if isinstance(daily_data, list):
-                daily_data.extend(new_daily_leads)
-            else:
-                daily_data = new_daily_leads
-            
-            # Write the combined data to daily file
-            with open(daily_filename, 'w') as f:
-                json.dump(daily_data, f, indent=2)
-                f.flush()
-                
-            self.report_progress(f"Berhasil menyimpan {len(new_daily_leads)} leads baru ke file template harian", 'success')
-            
+            next_button = self.driver.find_element(By.XPATH, "//button[@aria-label='Next']")
+            if not next_button.is_enabled():
+                print("Mencapai halaman terakhir, menghentikan...")
+                return False
+            old_card = self.driver.find_element(By.CSS_SELECTOR, "#search-results-container li")
+            if not self._throttle('page_view'):
+                return None
+            next_button.click()
+            print(f"Pindah ke halaman {page + 1}")
+            self.readiness.wait_for_results_change(old_card, 'search-results-container')
+            self.pace()
+            return True
         except Exception as e:
-            self.report_progress(f"Error saat menyimpan ke file template harian: {str(e)}", 'error')
-    
-    def direct_access_and_connect(self, search_url):
+            print("Tidak ada halaman lagi yang tersedia")
+            return None
+
+    def direct_access_and_connect(self, search_url, resume=False):
+        page = 1
+        resume_after = None
+        if resume:
+            checkpoint = self._get_checkpoints().load(search_url)
+            if checkpoint:
+                page = checkpoint['page']
+                resume_after = checkpoint['last_member_id']
+                self.lead_count_offset = checkpoint['leads_saved']
+                self.report_progress(f"Melanjutkan dari halaman {page} ({self.lead_count_offset} leads sudah tersimpan)")
+
+        started = False
+        finished = False
         try:
             if not self.setup_driver():
                 print("Gagal menyiapkan driver, keluar...")
                 return
             
-            # Try to access the search URL directly
-            self.driver.get(search_url)
-            time.sleep(random.uniform(2, 4))
-            
-            # Check if we need to login
-            if "login" in self.driver.current_url.lower():
-                print("Login diperlukan, melanjutkan dengan login...")
-                self.login_to_sales_navigator()
-                # After login, navigate back to search URL
-                self.driver.get(search_url)
-                time.sleep(random.uniform(2, 4))
+            # Jump straight to the saved page instead of paging through the ones already handled
+            self._open_search(with_page(search_url, page))
+            started = True
             
-            page = 1
             while True and self.is_running:
                 print(f"\nMemproses halaman {page}")
                 
                 # Check if we've reached the lead limit before processing the page
-                if self.lead_limit and len(self.leads_data) >= self.lead_limit:
+                if self._lead_limit_reached():
                     self.report_progress(f"Mencapai batas leads {self.lead_limit}. Menghentikan crawler...", 'info')
                     self.is_running = False
                     break
                     
                 # Extract leads from current page
-                self.extract_leads_from_page()
+                self.metrics.incr('page')
+                self.extract_leads_from_page(resume_after)
+                resume_after = None
                 
                 # Check again after processing the page
                 if not self.is_running:
                     break
                 
-                # Try to move to next page
+                # Try to move to next page; False means the last page, None a failed click
+                moved = self._go_to_next_page(page)
+                if not moved:
+                    finished = moved is False
+                    break
+                page += 1
+                self.last_member_id = None
+                self._save_checkpoint(search_url, page)
+                
+        finally:
+            if finished:
+                self._get_checkpoints().clear(search_url)
+            elif started:
+                self._save_checkpoint(search_url, page)
+            self.close_storage()
+            self.release_driver()
+
+    def _get_checkpoints(self):
+        if self.checkpoints is None:
+            self.checkpoints = CheckpointStore(self._get_lead_store())
+        return self.checkpoints
+
+    def _save_checkpoint(self, search_url, page):
+        try:
+            self._get_checkpoints().save(search_url, self.template_name, page, self.last_member_id, self._lead_count())
+        except Exception as e:
+            self.report_progress(f"Gagal menyimpan checkpoint: {str(e)}", 'error')
+
+    def _lead_count(self):
+        return self.lead_count_offset + len(self.leads_data)
+
+    def _lead_limit_reached(self):
+        return bool(self.lead_limit) and self._lead_count() >= self.lead_limit
+
+    def _get_lead_queue(self):
+        if self.lead_queue is None:
+            self.lead_queue = LeadQueue(self._get_lead_store())
+        return self.lead_queue
+
+    def harvest_search(self, search_url):
+        """Tahap 1: menelusuri semua halaman pencarian dan memasukkan leads ke antrean tanpa mengirim koneksi."""
+        try:
+            if not self.setup_driver():
+                print("Gagal menyiapkan driver, keluar...")
+                return
+
+            self._open_search(search_url)
+
+            page = 1
+            total = 0
+            while self.is_running:
+                self.report_progress(f"Mengambil leads dari halaman {page}")
+                total += self.harvest_leads_from_page(search_url)
+
+                if self.lead_limit and total >= self.lead_limit:
+                    self.report_progress(f"Mencapai batas leads {self.lead_limit}. Menghentikan harvest...", 'info')
+                    break
+
+                if not self.is_running or not self._go_to_next_page(page):
+                    break
+                page += 1
+
+            self.report_progress(f"Harvest selesai: {total} leads baru masuk antrean", 'success', {'queued': total})
+        finally:
+            self.close_storage()
+            self.release_driver()
+
+    def harvest_leads_from_page(self, search_url):
+        """Membaca semua kartu lead di halaman ini dan memasukkan yang belum diproses ke antrean."""
+        try:
+            self._load_seen_leads()
+
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.ID, "search-results-container"))
+            )
+            with self.metrics.timer('scroll'):
+                self.readiness.scroll_until_loaded('search-results-container')
+
+            records = []
+            for card in extract_cards(self.driver, 'search-results-container'):
+                if not card['name'] or not card['profile_url']:
+                    continue
+                member_id = canonical_member_id(card['profile_url'])
+                if member_id in self.seen_leads:
+                    continue
+                records.append({
+                    'member_id': member_id,
+                    'profile_url': card['profile_url'],
+                    'name': card['name'],
+                    'title': card['title'],
+                    'company': card['company']
+                })
+
+            queued = self._get_lead_queue().enqueue(records, self.template_name, search_url)
+            self.report_progress(f"{queued} leads baru dimasukkan ke antrean ({len(records)} ditemukan)", 'success')
+            return queued
+        except Exception as e:
+            self.report_progress(f"Error memproses halaman: {str(e)}", 'error')
+            return 0
+
+    def connect_from_queue(self, title_filter=None):
+        """Tahap 2: mengambil leads dari antrean satu per satu dan mengirim koneksi dari halaman lead-nya."""
+        lead_queue = self._get_lead_queue()
+        item = None
+        try:
+            if not self.setup_driver():
+                print("Gagal menyiapkan driver, keluar...")
+                return
+
+            self._load_seen_leads()
+            logged_in = False
+
+            while self.is_running:
+                if self._lead_limit_reached():
+                    self.report_progress(f"Mencapai batas leads {self.lead_limit}. Menghentikan crawler...", 'info')
+                    break
+
+                item = lead_queue.claim(self.email, self.template_name, title_filter)
+                if item is None:
+                    self.report_progress("Antrean leads kosong", 'info')
+                    break
+
+                if item['member_id'] in self.seen_leads:
+                    lead_queue.complete(item['member_id'], 'skipped')
+                    item = None
+                    continue
+
+                if not self._throttle('page_view'):
+                    break
+
+                status = 'failed'
+                lead_started = time.perf_counter()
                 try:
-                    next_button = self.driver.find_element(By.XPATH, "//button[@aria-label='Next']")
-                    if not next_button.is_enabled():
-                        print("Mencapai halaman terakhir, menghentikan...")
+                    self.driver.get(item['profile_url'])
+                    self.wait_for_page()
+                    if not logged_in and "login" in self.driver.current_url.lower():
+                        self.login_to_sales_navigator()
+                        self.driver.get(item['profile_url'])
+                        self.wait_for_page()
+                    logged_in = True
+
+                    self.report_progress(f"Memproses lead {item['name']} dari antrean {item['profile_url']}")
+                    action_button = WebDriverWait(self.driver, 10).until(
+                        EC.element_to_be_clickable((By.XPATH, "//button[contains(@aria-label, 'more actions') or contains(@aria-label, 'overflow')]"))
+                    )
+                    personalized_note = self._send_connection(item['name'], action_button)
+                    if personalized_note is NOT_ATTEMPTED:
+                        # Nothing was sent; the finally below puts the claim back in the queue
                         break
-                    next_button.click()
-                    print(f"Pindah ke halaman {page + 1}")
-                    time.sleep(random.uniform(3, 5))
-                    page += 1
+                    if personalized_note is not None:
+                        self._record_lead({
+                            'name': item['name'],
+                            'profile_url': item['profile_url'],
+                            'member_id': item['member_id'],
+                            'title': item['title'],
+                            'company': item['company'],
+                            'connection_status': 'success',
+                            'note_sent': personalized_note,
+                            'search_url': item['search_url']
+                        }, lead_started)
+                        status = 'done'
+                except TimeoutException:
+                    self.report_progress(f"Tombol aksi untuk lead {item['name']} tidak tersedia", 'error')
                 except Exception as e:
-                    print("Tidak ada halaman lagi yang tersedia")
-                    break
-                
+                    self.report_progress(f"Error memproses lead {item['name']}: {str(e)}", 'error')
+
+                lead_queue.complete(item['member_id'], status)
+                item = None
+
         finally:
-            if self.driver:
-                self.driver.quit()
+            # A lead claimed when the job stopped goes back to the queue for the next run
+            if item is not None:
+                lead_queue.release(item['member_id'])
+            self.close_storage()
+            self.release_driver()
+
+    def _send_connection(self, lead_name, action_button):
+        """Alur koneksi: tombol aksi -> Connect -> catatan -> Kirim.
+
+        Mengembalikan catatan yang dikirim, None jika gagal, atau NOT_ATTEMPTED jika kuota habis / crawler dihentikan.
+        """
+        with self.metrics.timer('open_actions'):
+            action_button.click()
+            
+            # Wait for the actions menu to render instead of a fixed pause
+            connect_button = WebDriverWait(self.driver, 5).until(
+                EC.presence_of_element_located((By.XPATH, "//button[normalize-space()='Connect' or contains(normalize-space(), 'Connect')]"))
+            )
+        if not connect_button.is_enabled():
+            self.report_progress("Tombol 'Connect' tidak dapat diklik, pindah ke lead berikutnya...", 'error')
+            return None
+            
+        # Fires as soon as the account's connect budget allows
+        if not self._throttle('connect'):
+            return NOT_ATTEMPTED
+        
+        try:
+            with self.metrics.timer('click_connect'):
+                connect_button.click()
+                note_field = WebDriverWait(self.driver, 3).until(
+                    EC.presence_of_element_located((By.ID, "connect-cta-form__invitation"))
+                )
+            
+            # Normalize lead name - capitalize first letter of each word
+            normalized_name = ' '.join(word.capitalize() for word in lead_name.lower().split())
+            
+            # Replace [lead_name] with normalized name if it exists in the note
+            personalized_note = self.connect_note.replace('[lead_name]', normalized_name) if '[lead_name]' in self.connect_note else self.connect_note
+            with self.metrics.timer('type_note'):
+                self.enter_text(note_field, personalized_note, self.note_input, 'catatan')
+            
+            # Find and click the Send button
+            send_button = WebDriverWait(self.driver, 3).until(
+                EC.element_to_be_clickable((By.CLASS_NAME, "connect-cta-form__send"))
+            )
+            if not send_button.is_enabled():
+                self.report_progress("Tombol 'Kirim' tidak dapat diklik, pindah ke lead berikutnya...", 'error')
+                return None
+                
+            if not self._throttle('note_send'):
+                return NOT_ATTEMPTED
+            with self.metrics.timer('send'):
+                send_button.click()
+                
+                # The next lead can start as soon as the invitation form has closed
+                try:
+                    WebDriverWait(self.driver, 5).until(
+                        EC.invisibility_of_element_located((By.ID, "connect-cta-form__invitation"))
+                    )
+                except TimeoutException:
+                    pass
+            self.report_progress(f"Permintaan koneksi dikirim untuk lead {lead_name}", 'success')
+            return personalized_note
+            
+        except TimeoutException:
+            self.metrics.incr('connect_failed')
+            self.report_progress("Tidak dapat menemukan kolom catatan atau formulir tertutup, melanjutkan ke lead berikutnya...", 'error')
+            return None
+        except Exception as e:
+            self.metrics.incr('connect_failed')
+            self.report_progress(f"Error dalam alur koneksi: {str(e)}, pindah ke lead berikutnya...", 'error')
+            return None
 
-    def extract_leads_from_page(self):
+    def _record_lead(self, lead_data, started=None):
+        if started is not None:
+            self.metrics.lead_finished(time.perf_counter() - started)
+        self.report_progress(f"Berhasil terhubung dengan: {lead_data['name']}", 'success', lead_data)
+        
+        # Queue the lead for the background writer
+        self.seen_leads.add(lead_data['member_id'])
+        self.leads_data.append(lead_data)
+        self.lead_writer.add(lead_data)
+        self.report_progress(f"Data lead disimpan: {lead_data['name']} - {lead_data['profile_url']} ({self._lead_count()}/{self.lead_limit if self.lead_limit else 'unlimited'})", 'success')
+
+    def extract_leads_from_page(self, resume_after=None):
+        """Memproses semua kartu lead di halaman ini; resume_after melewati kartu sampai member ID tersebut."""
         leads = []
         try:
+            self._load_seen_leads()
+
             # Wait for the search results container to load
-            container = WebDriverWait(self.driver, 10).until(
+            WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.ID, "search-results-container"))
             )
             
-            # Scroll the container down in smaller increments
-            last_height = container.get_attribute("scrollHeight")
-            while True:
-                # Scroll down in increments
-                for i in range(3):
-                    self.driver.execute_script(
-                        f"document.getElementById('search-results-container').scrollTop = {(i + 1) * (int(last_height)/3)}"
-                    )
-                    time.sleep(1)
-                
-                # Wait for new content
-                time.sleep(5)
-                
-                # Calculate new scroll height
-                new_height = container.get_attribute("scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
+            # Scroll the container one viewport at a time, each step waits only until its cards render
+            with self.metrics.timer('scroll'):
+                rendered = self.readiness.scroll_until_loaded('search-results-container')
+            self.report_progress(f"{rendered} lead dimuat di halaman ini")
             
             # Scroll back to top
             self.driver.execute_script("document.getElementById('search-results-container').scrollTop = 0")
-            time.sleep(random.uniform(1, 2))
+            self.pace()
+            
+            # Read every card (name, URL, title, company, action button) in a single script call
+            lead_cards = extract_cards(self.driver, 'search-results-container')
             
-            # Find all lead cards using li elements within the container's ol
-            lead_cards = container.find_element(By.TAG_NAME, "ol").find_elements(By.TAG_NAME, "li")
+            # On a resumed page, start after the last card the previous run handled
+            start = 0
+            if resume_after:
+                for index, card in enumerate(lead_cards):
+                    if card['profile_url'] and canonical_member_id(card['profile_url']) == resume_after:
+                        start = index + 1
+                        break
             
             # Process each lead card one by one
-            for index, card in enumerate(lead_cards):
+            for index, card in enumerate(lead_cards[start:], start):
+                if not self.is_running:
+                    return leads
+
                 # Check if we've reached the lead limit
-                if self.lead_limit and len(self.leads_data) >= self.lead_limit:
+                if self._lead_limit_reached():
                     self.report_progress(f"Mencapai batas leads {self.lead_limit}. Menghentikan crawler...", 'info')
                     self.is_running = False
                     return leads
 
+                member_id = None
                 try:
-                    # Get lead name and profile URL using the new selector
-                    lead_name_element = card.find_element(By.CSS_SELECTOR, '[data-view-name="search-results-lead-name"]')
-                    lead_name = lead_name_element.text
-                    profile_url = lead_name_element.get_attribute('href')
+                    # Name and profile URL come from the precomputed card record
+                    lead_name = card['name']
+                    profile_url = card['profile_url']
+                    if not lead_name or not profile_url:
+                        self.report_progress(f"Lead {index + 1} tidak memiliki nama atau URL profil, dilewati", 'error')
+                        continue
                     
+                    # Skip leads that were already contacted before spending any clicks on them
+                    member_id = canonical_member_id(profile_url)
+                    if member_id in self.seen_leads:
+                        self.metrics.incr('lead_skipped_seen')
+                        self.report_progress(f"Lead {lead_name} sudah pernah diproses, dilewati")
+                        continue
+
+                    lead_started = time.perf_counter()
                     self.report_progress(f"Memproses lead {lead_name} {index + 1} dari {len(lead_cards)} {profile_url}")
 
                     # Connect flow
-                    three_dot_button = card.find_element(By.XPATH, ".//button[contains(@aria-label, 'more actions')]")
-                    three_dot_button.click()
-                    time.sleep(random.uniform(1, 2))
-                    
-                    # Find and click the Connect button
-                    connect_button = self.driver.find_element(By.XPATH, "//button[normalize-space()='Connect' or contains(normalize-space(), 'Connect')]")
-                    if not connect_button.is_enabled():
-                        self.report_progress("Tombol 'Connect' tidak dapat diklik, pindah ke lead berikutnya...", 'error')
-                        continue
-                        
-                    connect_button.click()
-                    time.sleep(random.uniform(1, 2))
-                    
-                    try:
-                        note_field = WebDriverWait(self.driver, 3).until(
-                            EC.presence_of_element_located((By.ID, "connect-cta-form__invitation"))
-                        )
-                        
-                        # Normalize lead name - capitalize first letter of each word
-                        normalized_name = ' '.join(word.capitalize() for word in lead_name.lower().split())
-                        
-                        # Replace [lead_name] with normalized name if it exists in the note
-                        personalized_note = self.connect_note.replace('[lead_name]', normalized_name) if '[lead_name]' in self.connect_note else self.connect_note
-                        self.type_like_human(note_field, personalized_note)
-                        
-                        # Find and click the Send button
-                        send_button = WebDriverWait(self.driver, 3).until(
-                            EC.element_to_be_clickable((By.CLASS_NAME, "connect-cta-form__send"))
-                        )
-                        if not send_button.is_enabled():
-                            self.report_progress("Tombol 'Kirim' tidak dapat diklik, pindah ke lead berikutnya...", 'error')
-                            continue
-                            
-                        send_button.click()
-                        self.report_progress(f"Permintaan koneksi dikirim untuk lead {index + 1} {lead_name}", 'success')
-                        time.sleep(random.uniform(2, 3))
-                        
-                        # Update lead data with the new selectors
-                        lead_data = {
-                            'name': lead_name,
-                            'profile_url': profile_url,
-                            'connection_status': 'success',
-                            'note_sent': personalized_note,  # Store the personalized note
-                            'search_url': self.driver.current_url
-                        }
-                        
-                        self.report_progress(f"Berhasil terhubung dengan: {lead_data['name']}", 'success', lead_data)
-                        
-                    except TimeoutException:
-                        self.report_progress("Tidak dapat menemukan kolom catatan atau formulir tertutup, melanjutkan ke lead berikutnya...", 'error')
+                    if not card['has_actions']:
+                        self.report_progress(f"Tombol aksi untuk lead {lead_name} tidak tersedia, pindah ke lead berikutnya...", 'error')
                         continue
-                    except Exception as e:
-                        self.report_progress(f"Error dalam alur koneksi: {str(e)}, pindah ke lead berikutnya...", 'error')
+                    personalized_note = self._send_connection(lead_name, card['action_button'])
+                    if personalized_note is NOT_ATTEMPTED:
+                        # This lead was never contacted, so a resumed crawl must start from it
+                        member_id = None
+                        return leads
+                    if personalized_note is None:
                         continue
                     
-                    leads.append(lead_data)
+                    # Update lead data with the new selectors
+                    lead_data = {
+                        'name': lead_name,
+                        'profile_url': profile_url,
+                        'member_id': member_id,
+                        'title': card['title'],
+                        'company': card['company'],
+                        'connection_status': 'success',
+                        'note_sent': personalized_note,  # Store the personalized note
+                        'search_url': self.driver.current_url
+                    }
                     
-                    # Save progress after each lead
-                    self.leads_data.append(lead_data)
-                    self.save_leads_to_file()
-                    self.report_progress(f"Data lead disimpan: {lead_data['name']} - {lead_data['profile_url']} ({len(self.leads_data)}/{self.lead_limit if self.lead_limit else 'unlimited'})", 'success')
+                    leads.append(lead_data)
+                    self._record_lead(lead_data, lead_started)
                     
                 except Exception as e:
                     self.report_progress(f"Error memproses lead {index + 1}: {str(e)}", 'error')
                     continue
+                finally:
+                    # Only cards that were actually handled move the resume point forward
+                    if member_id:
+                        self.last_member_id = member_id
                     
         except Exception as e:
             self.report_progress(f"Error memproses halaman: {str(e)}", 'error')
@@ -460,7 +908,9 @@ class SalesNavigatorScraper:
     def stop(self):
         """Menghentikan crawler dengan baik"""
         self.is_running = False
-        if self.driver:
+        self.close_storage()
+        # With a pool the crawl thread hands the session back itself once it sees is_running
+        if self.driver and not self.driver_pool:
             try:
                 self.driver.quit()
             except Exception as e:
@@ -1,15 +1,35 @@
 from flask import Flask, request, send_from_directory, jsonify, Response
 from sales_navigator_scraper import SalesNavigatorScraper
-from uuid import uuid4
+from lead_store import LeadStore
+from lead_identity import SeenLeadIndex
+from lead_counter import LeadCounter
+from response_cache import ResponseCache
+from template_registry import TemplateRegistry
+from crawler_pool import CrawlerPool
+from driver_pool import DriverPool
+from session_store import SessionStore
+from lead_queue import LeadQueue
+from crawl_checkpoint import CheckpointStore
+from action_scheduler import ActionScheduler
+from progress_bus import ProgressBus
+from crawl_metrics import REGISTRY, render_job_metrics
 import threading
-import queue
 import json
+import csv
+import io
 import time
 import os
+import atexit
 
 app = Flask(__name__)
-active_crawlers = {}
-progress_queues = {}
+# Progress events per job, buffered for every tab that follows the job
+progress_bus = ProgressBus()
+
+# Browsers that may run at the same time, one per Sales Navigator seat at most
+MAX_CONCURRENT_BROWSERS = int(os.environ.get('MAX_CONCURRENT_BROWSERS', max(1, (os.cpu_count() or 2) // 2)))
+
+# 'full' (headed) or 'lean' (headless, no images/fonts/media), see browser_profile.py
+BROWSER_PROFILE = os.environ.get('BROWSER_PROFILE', 'full')
 
 # --- Helper: pastikan folder db dan file templates.json ada ---
 def ensure_db():
@@ -22,109 +42,343 @@ def ensure_db():
             json.dump({}, f)
     return json_path
 
+template_registry = TemplateRegistry(ensure_db())
+# Pending template edits are written out when the server exits
+atexit.register(template_registry.close)
+lead_store = LeadStore()
+lead_counter = LeadCounter()
+# Leads harvested from searches and waiting for the connect stage
+lead_queue = LeadQueue(lead_store)
+checkpoints = CheckpointStore(lead_store)
+# Saved browser sessions under db/sessions, next to the lead store
+session_store = SessionStore()
+history_cache = ResponseCache(maxsize=256)
+
+# Days of history returned per page by /get_template_history and /get_template_data
+HISTORY_DEFAULT_DAYS = 30
+HISTORY_MAX_DAYS = 365
+lead_store.add_listener(lead_counter.bump)
+
+# Pick up daily files and snapshots written before the lead store existed
+lead_store.import_json_files()
+lead_counter.seed(lead_store.count_by_template())
+
+seen_leads = None
+seen_leads_lock = threading.Lock()
+
+# One scheduler per account so every job of that account draws from the same budget
+action_schedulers = {}
+action_schedulers_lock = threading.Lock()
+
+def get_action_scheduler(account, limits=None):
+    with action_schedulers_lock:
+        scheduler = action_schedulers.get(account)
+        if scheduler is None:
+            scheduler = action_schedulers[account] = ActionScheduler(account, lead_store)
+    # Per-job limits, e.g. {"connect": {"per_hour": 20, "daily_cap": 50}}, leave the account's policies alone
+    if limits:
+        return scheduler.for_job(limits)
+    return scheduler
+
+def get_seen_leads():
+    # Shared across jobs so duplicates are skipped across templates and days
+    global seen_leads
+    with seen_leads_lock:
+        if seen_leads is None:
+            seen_leads = SeenLeadIndex(lead_store)
+        return seen_leads
+
 @app.route('/')
+@app.route('/index.html')
 def home():
     return send_from_directory('.', 'index.html')
 
+@app.route('/lead_counts.html')
+def lead_counts_page():
+    return send_from_directory('.', 'lead_counts.html')
+
 # ==============================
 # CRAWLER ENDPOINTS
 # ==============================
 
+def report_job_finished(job):
+    if job.scraper:
+        job.scraper.metrics.finish()
+    messages = {
+        'completed': 'Crawler completed',
+        'stopped': 'Crawler stopped by user',
+        'failed': f'Crawler failed: {job.error}'
+    }
+    progress_bus.publish(job.id, {
+        'message': messages.get(job.status, f'Crawler {job.status}'),
+        'status': 'error' if job.status == 'failed' else job.status,
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+    })
+    progress_bus.close(job.id)
+
+crawler_pool = CrawlerPool(max_browsers=MAX_CONCURRENT_BROWSERS, on_finish=report_job_finished)
+# Idle logged-in browsers kept warm between jobs, counted against MAX_CONCURRENT_BROWSERS and closed when the server exits
+driver_pool = DriverPool(max_idle=MAX_CONCURRENT_BROWSERS, max_browsers=MAX_CONCURRENT_BROWSERS)
+atexit.register(driver_pool.close)
+
 @app.route('/start-crawler', methods=['POST'])
 def start_crawler():
     data = request.json
-    queue_id = str(threading.get_ident())
-    progress_queues[queue_id] = queue.Queue()
+
+    # index.html sends the limit as a string, empty for no limit
+    lead_limit = data.get('leadLimit')
+    if lead_limit in (None, ''):
+        lead_limit = None
+    else:
+        try:
+            lead_limit = int(lead_limit)
+        except (TypeError, ValueError):
+            lead_limit = 0
+        if lead_limit < 1:
+            return jsonify({'status': 'error', 'message': 'leadLimit must be a positive whole number'}), 400
     
-    def run_crawler():
+    def run_crawler(job):
         scraper = SalesNavigatorScraper(
             email=data['email'],
             password=data['password'],
             connect_note=data['connectNote'],
-            progress_queue=progress_queues[queue_id],
-            template_name=data['templateName']
+            progress_queue=progress_bus.publisher(job.id),
+            job_id=job.id,
+            template_name=data['templateName'],
+            lead_limit=lead_limit,
+            storage_mode=data.get('storageMode', 'json'),
+            human_pacing=data.get('humanPacing'),
+            lead_store=lead_store,
+            session_store=session_store,
+            seen_leads=get_seen_leads(),
+            driver_pool=driver_pool,
+            lead_queue=lead_queue,
+            browser_profile=data.get('browserProfile', BROWSER_PROFILE),
+            action_scheduler=get_action_scheduler(data['email'], data.get('actionLimits')),
+            note_input=data.get('noteInput', 'bulk'),
+            login_input=data.get('loginInput', 'chunked')
         )
-        active_crawlers[queue_id] = scraper
-        scraper.direct_access_and_connect(data['searchUrl'])
-        progress_queues[queue_id].put({
-            'message': 'Crawler completed',
-            'status': 'completed',
+        job.scraper = scraper
+        try:
+            # The job may have been stopped while the scraper was being created
+            if job.stop_requested:
+                return
+            # 'harvest' only fills the lead queue, 'queue' drains it, 'connect' does both in one pass
+            mode = data.get('mode', 'connect')
+            if mode == 'harvest':
+                scraper.harvest_search(data['searchUrl'])
+            elif mode == 'queue':
+                scraper.connect_from_queue(title_filter=data.get('titleFilter'))
+            else:
+                # resume continues from the search's saved checkpoint instead of page 1
+                scraper.direct_access_and_connect(data['searchUrl'], resume=bool(data.get('resume')))
+        finally:
+            # Stops the scraper's lead writer thread even when the job never started crawling
+            scraper.close_storage()
+    
+    job = crawler_pool.submit(data['email'], run_crawler, params=data)
+    progress_bus.open(job.id)
+    if job.status == 'queued':
+        progress_bus.publish(job.id, {
+            'message': 'Crawler queued, waiting for a free browser slot or for this account to finish its current job',
+            'status': 'info',
             'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
         })
-        active_crawlers.pop(queue_id, None)
-    
-    thread = threading.Thread(target=run_crawler)
-    thread.start()
     
-    return jsonify({'status': 'success', 'message': 'Crawler started', 'queue_id': queue_id})
+    return jsonify({'status': 'success', 'message': 'Crawler started', 'queue_id': job.id, 'job_id': job.id})
 
 @app.route('/stop-crawler', methods=['POST'])
 def stop_crawler():
     try:
-        for queue_id, crawler in active_crawlers.items():
-            crawler.stop()
-            if queue_id in progress_queues:
-                progress_queues[queue_id].put({
-                    'message': 'Crawler stopped by user',
-                    'status': 'stopped',
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                })
+        # Stops one job when a job_id is given, otherwise every active job
+        data = request.get_json(silent=True) or {}
+        if data.get('job_id'):
+            if not crawler_pool.stop(data['job_id']):
+                return jsonify({'status': 'error', 'message': 'Job not found or already finished'}), 404
+            stopped = [data['job_id']]
+        else:
+            stopped = crawler_pool.stop_all()
         
-        active_crawlers.clear()
-        return jsonify({'status': 'success', 'message': 'Crawler stopped'})
+        return jsonify({'status': 'success', 'message': 'Crawler stopped', 'stopped': stopped})
     except Exception as e:
         return jsonify({'status': 'error', 'message': f'Error stopping crawler: {str(e)}'}), 500
 
+@app.route('/sessions/prewarm', methods=['POST'])
+def prewarm_session():
+    # Launches and logs in a browser for the account so its next job starts immediately
+    data = request.json
+
+    def run_warm_up(job):
+        scraper = SalesNavigatorScraper(
+            email=data['email'],
+            password=data['password'],
+            progress_queue=progress_bus.publisher(job.id),
+            job_id=job.id,
+            lead_store=lead_store,
+            session_store=session_store,
+            driver_pool=driver_pool,
+            browser_profile=data.get('browserProfile', BROWSER_PROFILE),
+            action_scheduler=get_action_scheduler(data['email']),
+            login_input=data.get('loginInput', 'chunked')
+        )
+        job.scraper = scraper
+        try:
+            if not scraper.warm_up_session():
+                raise RuntimeError('Could not start a browser session')
+        finally:
+            scraper.close_storage()
+
+    job = crawler_pool.submit(data['email'], run_warm_up, params={'templateName': None})
+    progress_bus.open(job.id)
+    return jsonify({'status': 'success', 'message': 'Session warm-up started', 'job_id': job.id})
+
+@app.route('/sessions', methods=['GET'])
+def list_sessions():
+    return jsonify(driver_pool.idle_sessions())
+
+@app.route('/sessions/usage', methods=['GET'])
+def session_usage():
+    account = request.args.get('account')
+    if not account:
+        return jsonify({'error': 'account is required'}), 400
+    return jsonify(get_action_scheduler(account).usage())
+
+@app.route('/crawlers', methods=['GET'])
+def list_crawlers():
+    return jsonify(crawler_pool.list_jobs())
+
+@app.route('/crawlers/<job_id>', methods=['GET'])
+def crawler_status(job_id):
+    job = crawler_pool.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/crawlers/<job_id>/metrics', methods=['GET'])
+def crawler_metrics(job_id):
+    job = crawler_pool.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    if not job.scraper:
+        return jsonify({'job_id': job_id, 'status': job.status, 'phases': {}, 'counters': {}})
+    return jsonify(dict(job.scraper.metrics.snapshot(), job_id=job_id, status=job.status))
+
+@app.route('/metrics')
+def metrics():
+    jobs = [(job.id, job.account, job.scraper.metrics) for job in list(crawler_pool.jobs.values()) if job.scraper]
+    body = REGISTRY.render() + render_job_metrics(jobs)
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+@app.route('/crawlers/<job_id>/stop', methods=['POST'])
+def stop_crawler_job(job_id):
+    if not crawler_pool.stop(job_id):
+        return jsonify({'status': 'error', 'message': 'Job not found or already finished'}), 404
+    return jsonify({'status': 'success', 'message': 'Crawler stopped', 'stopped': [job_id]})
+
+def sse_frame(events, dropped=0):
+    # One frame per batch; its id is the last event's, so Last-Event-ID resumes after the batch
+    if dropped:
+        events = [{
+            'message': f'{dropped} earlier progress messages are no longer available',
+            'status': 'info',
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+        }] + events
+    return f"id: {events[-1].get('id', 0)}\ndata: {json.dumps(events)}\n\n"
+
+def parse_last_event_id(headers, args):
+    # Sent by EventSource on reconnect; ?last_event_id= lets a new tab replay from a known point
+    last_event_id = headers.get('Last-Event-ID') or args.get('last_event_id') or '0'
+    try:
+        return int(last_event_id)
+    except ValueError:
+        return 0
+
 @app.route('/stream/<queue_id>')
 def stream_progress(queue_id):
+    if progress_bus.get(queue_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    last_id = parse_last_event_id(request.headers, request.args)
+
     def generate():
-        q = progress_queues.get(queue_id)
-        if not q:
-            return
-            
+        cursor = last_id
+        yield "retry: 2000\n\n"
         while True:
-            try:
-                progress = q.get(timeout=1)
-                if progress is None:
-                    break
-                yield f"data: {json.dumps(progress)}\n\n"
-            except queue.Empty:
-                if queue_id not in active_crawlers:
-                    break
-                continue
-            
-        progress_queues.pop(queue_id, None)
-    
-    return Response(generate(), mimetype='text/event-stream')
+            events, dropped, closed = progress_bus.wait_for_events(queue_id, cursor)
+            if events:
+                cursor = events[-1]['id']
+                yield sse_frame(events, dropped)
+            elif closed:
+                # Tells the page to close instead of letting EventSource reconnect
+                yield "event: end\ndata: {}\n\n"
+                break
+            else:
+                # Keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 # ==============================
 # TEMPLATE DATA ENDPOINTS
 # ==============================
 
+def history_page_params(args):
+    """Read the from/to/limit/cursor paging parameters shared by the history endpoints."""
+    try:
+        limit = int(args.get('limit', HISTORY_DEFAULT_DAYS))
+    except ValueError:
+        limit = HISTORY_DEFAULT_DAYS
+    return (
+        args.get('from'),
+        args.get('to'),
+        max(1, min(limit, HISTORY_MAX_DAYS)),
+        args.get('cursor')
+    )
+
+def template_data_rows(history):
+    return [{
+        'date': entry['date'],
+        'profiles': entry['leads'],
+        'connected': sum(1 for lead in entry['leads'] if lead.get('connection_status') == 'success')
+    } for entry in history]
+
+# Response body builders for the history endpoints, shared with asgi_server.py
+HISTORY_BUILDERS = {
+    'data': template_data_rows,
+    'history': lambda history: history
+}
+
+def history_page(endpoint, template, params):
+    """Return (json body, next cursor) for a history page, rebuilt only when the lead store changed."""
+    key = (endpoint, template) + params
+    revision = lead_store.revision()
+
+    cached = history_cache.get(key, revision)
+    if cached is None:
+        history, next_cursor = lead_store.get_history(template, *params)
+        cached = (json.dumps(HISTORY_BUILDERS[endpoint](history)), next_cursor)
+        history_cache.put(key, revision, cached)
+    return cached
+
+def cached_history_response(endpoint, template):
+    """Serve a history page from the response cache."""
+    body, next_cursor = history_page(endpoint, template, history_page_params(request.args))
+    response = Response(body, mimetype='application/json')
+    # The next page of older days is requested with ?cursor=<X-Next-Cursor>
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
 @app.route('/get_template_data')
 def get_template_data():
     template = request.args.get('template')
     if not template:
         return jsonify([]), 400
 
-    ensure_db()
-    data_files = [f for f in os.listdir('db') if f.endswith('.json') and template in f]
-    all_data = []
-
-    for file in data_files:
-        try:
-            date = "-".join(file.split('-')[:3])
-            with open(os.path.join('db', file), 'r') as f:
-                data = json.load(f)
-                all_data.append({
-                    'date': date,
-                    'profiles': data.get('profiles', []),
-                    'connected': len(data.get('connected', []))
-                })
-        except Exception:
-            continue
-
-    return jsonify(all_data)
+    return cached_history_response('data', template)
 
 @app.route('/get_template_history')
 def get_template_history():
@@ -132,24 +386,104 @@ def get_template_history():
     if not template:
         return jsonify([]), 400
         
-    ensure_db()
-    history = []
-    
-    for filename in os.listdir('db'):
-        if filename.endswith('.json') and template in filename:
-            file_path = os.path.join('db', filename)
-            try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    date = "-".join(filename.split('-', 3)[:3])
-                    history.append({
-                        'date': date,
-                        'leads': data
-                    })
-            except Exception as e:
-                print(f'Error reading {filename}: {str(e)}')
-    
-    return jsonify(history)
+    return cached_history_response('history', template)
+
+@app.route('/api/lead-counts')
+def get_lead_counts():
+    etag, counts = lead_counter.snapshot()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    response = jsonify({
+        'counts': counts,
+        'total': sum(item['count'] for item in counts)
+    })
+    response.set_etag(etag)
+    return response
+
+# Columns of the CSV export; NDJSON lines carry every stored field
+EXPORT_CSV_FIELDS = ('member_id', 'name', 'profile_url', 'title', 'company', 'template', 'date',
+                     'connection_status', 'note_sent', 'search_url', 'timestamp')
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+# Leads per chunk written to the response
+EXPORT_CHUNK_ROWS = 200
+
+def export_filters(args):
+    """Read the template/from/to/status filters of the export endpoint (status may be comma separated)."""
+    statuses = [status.strip() for status in (args.get('status') or '').split(',') if status.strip()]
+    return {
+        'template': args.get('template') or None,
+        'date_from': args.get('from') or None,
+        'date_to': args.get('to') or None,
+        'statuses': statuses or None
+    }
+
+def export_chunks(fmt, filters):
+    """Yield the export body in chunks of EXPORT_CHUNK_ROWS leads, so memory stays flat whatever the size."""
+    buffer = io.StringIO()
+    writer = None
+    if fmt == 'csv':
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        # The header goes out before the first query runs
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    rows = 0
+    for lead in lead_store.iter_export(**filters):
+        if writer:
+            writer.writerow(lead)
+        else:
+            buffer.write(json.dumps(lead, ensure_ascii=False))
+            buffer.write('\n')
+        rows += 1
+        # The first lead is sent on its own so the download starts right away
+        if rows == 1 or rows % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def export_headers(fmt):
+    return {
+        'Content-Disposition': f'attachment; filename="leads-{time.strftime("%Y%m%d-%H%M%S")}.{fmt}"',
+        'X-Accel-Buffering': 'no'
+    }
+
+@app.route('/api/export/leads', methods=['GET'])
+def export_leads():
+    fmt = request.args.get('format', 'ndjson').lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+
+    # No Content-Length, so the body goes out with chunked transfer encoding as it is produced
+    return Response(export_chunks(fmt, export_filters(request.args)),
+                    mimetype=EXPORT_FORMATS[fmt], headers=export_headers(fmt))
+
+@app.route('/api/checkpoints', methods=['GET'])
+def list_checkpoints():
+    return jsonify(checkpoints.list())
+
+@app.route('/api/lead-queue', methods=['GET'])
+def get_lead_queue():
+    template = request.args.get('template')
+    limit = min(request.args.get('limit', default=100, type=int), 1000)
+    return jsonify({
+        'counts': lead_queue.counts(template),
+        'pending': lead_queue.pending(template, request.args.get('title'), limit)
+    })
+
+@app.route('/api/lead-queue/skip', methods=['POST'])
+def skip_queued_leads():
+    member_ids = (request.json or {}).get('member_ids') or []
+    return jsonify({'status': 'success', 'skipped': lead_queue.skip(member_ids)})
 
 # ==============================
 # TEMPLATE MANAGEMENT (CRUD)
@@ -157,59 +491,31 @@ def get_template_history():
 
 @app.route('/api/templates', methods=['GET'])
 def get_templates():
-    json_path = ensure_db()
-    with open(json_path, 'r') as f:
-        return jsonify(json.load(f))
+    etag, body = template_registry.snapshot()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response
 
 @app.route('/api/templates', methods=['POST'])
 def create_template():
-    template_data = request.json
-    template_id = str(uuid4())
-
-    json_path = ensure_db()
-    with open(json_path, 'r') as f:
-        templates = json.load(f)
-    
-    templates[template_id] = template_data
-    
-    with open(json_path, 'w') as f:
-        json.dump(templates, f, indent=2)
-    
+    template_id = template_registry.create(request.json)
     return jsonify({'id': template_id})
 
 @app.route('/api/templates/<template_id>', methods=['PUT'])
 def update_template(template_id):
-    template_data = request.json
-    json_path = ensure_db()
-
-    with open(json_path, 'r') as f:
-        templates = json.load(f)
-    
-    if template_id not in templates:
+    if not template_registry.update(template_id, request.json):
         return jsonify({'error': 'Template not found'}), 404
     
-    templates[template_id] = template_data
-    
-    with open(json_path, 'w') as f:
-        json.dump(templates, f, indent=2)
-    
     return jsonify({'success': True})
 
 @app.route('/api/templates/<template_id>', methods=['DELETE'])
 def delete_template(template_id):
-    json_path = ensure_db()
-
-    with open(json_path, 'r') as f:
-        templates = json.load(f)
-    
-    if template_id not in templates:
+    if not template_registry.delete(template_id):
         return jsonify({'error': 'Template not found'}), 404
     
-    del templates[template_id]
-    
-    with open(json_path, 'w') as f:
-        json.dump(templates, f, indent=2)
-    
     return jsonify({'success': True})
 
 @app.route('/save-template', methods=['POST'])
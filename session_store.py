@@ -0,0 +1,117 @@
+"""Per-account store of authenticated LinkedIn sessions.
+
+After a successful login the browser's cookies and localStorage are saved,
+and a fresh browser gets them back before its first navigation, so most job
+starts skip the login form entirely. Session files hold credentials-equivalent
+data and are written with owner-only permissions.
+"""
+import os
+import json
+import time
+import hashlib
+
+from file_utils import atomic_write_json
+
+SESSION_DIR = os.path.join('db', 'sessions')
+LINKEDIN_ORIGIN = 'https://www.linkedin.com'
+
+DUMP_LOCAL_STORAGE_SCRIPT = """
+const items = {};
+for (let i = 0; i < window.localStorage.length; i++) {
+    const key = window.localStorage.key(i);
+    items[key] = window.localStorage.getItem(key);
+}
+return items;
+"""
+
+# Runs before any page script, restores localStorage once per browser on the LinkedIn origin
+RESTORE_LOCAL_STORAGE_SCRIPT = """
+(function(items) {
+    if (location.origin !== %(origin)s || window.sessionStorage.getItem('__session_restored')) return;
+    for (const [key, value] of Object.entries(items)) {
+        window.localStorage.setItem(key, value);
+    }
+    window.sessionStorage.setItem('__session_restored', '1');
+})(%(items)s);
+"""
+
+
+class SessionStore:
+    def __init__(self, session_dir=SESSION_DIR):
+        self.session_dir = session_dir
+
+    def _path(self, account):
+        digest = hashlib.sha256(account.lower().encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.session_dir, f'{digest}.json')
+
+    def save(self, account, driver):
+        """Save the cookies and localStorage of a logged-in browser."""
+        if not driver.current_url.startswith(LINKEDIN_ORIGIN):
+            driver.get(LINKEDIN_ORIGIN + '/sales')
+        session = {
+            'cookies': driver.get_cookies(),
+            'local_storage': driver.execute_script(DUMP_LOCAL_STORAGE_SCRIPT) or {},
+            'saved_at': time.time()
+        }
+        os.makedirs(self.session_dir, mode=0o700, exist_ok=True)
+        path = self._path(account)
+        atomic_write_json(path, session, indent=None)
+        os.chmod(path, 0o600)
+
+    def load(self, account):
+        path = self._path(account)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return None
+
+    def restore(self, account, driver):
+        """Load a saved session into a fresh Chrome driver. Returns True if one was applied.
+
+        Uses the DevTools protocol, so cookies are in place before the first
+        navigation and no extra page load is needed.
+        """
+        session = self.load(account)
+        if not session:
+            return False
+
+        now = time.time()
+        cookies = []
+        for cookie in session.get('cookies', []):
+            if cookie.get('expiry') and cookie['expiry'] < now:
+                continue
+            cdp_cookie = {
+                'name': cookie['name'],
+                'value': cookie['value'],
+                'domain': cookie.get('domain', '.linkedin.com'),
+                'path': cookie.get('path', '/'),
+                'secure': cookie.get('secure', False),
+                'httpOnly': cookie.get('httpOnly', False)
+            }
+            if cookie.get('expiry'):
+                cdp_cookie['expires'] = cookie['expiry']
+            if cookie.get('sameSite') in ('Strict', 'Lax', 'None'):
+                cdp_cookie['sameSite'] = cookie['sameSite']
+            cookies.append(cdp_cookie)
+        if not cookies:
+            return False
+
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+        if session.get('local_storage'):
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+                'source': RESTORE_LOCAL_STORAGE_SCRIPT % {
+                    'origin': json.dumps(LINKEDIN_ORIGIN),
+                    'items': json.dumps(session['local_storage'])
+                }
+            })
+        return True
+
+    def discard(self, account):
+        """Delete an account's saved session, e.g. after its restored cookies were rejected."""
+        path = self._path(account)
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,107 @@
+"""In-memory registry for db/templates.json.
+
+Templates are loaded once and served from memory. Mutations are serialized
+under a lock and written to disk atomically after a short delay, so a burst of
+edits costs one write.
+"""
+import os
+import json
+import logging
+import threading
+from uuid import uuid4
+
+from file_utils import atomic_write_json
+
+
+class TemplateRegistry:
+    def __init__(self, json_path, flush_delay=1.0):
+        self.json_path = json_path
+        self.flush_delay = flush_delay
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.flush_timer = None
+        # True while edits have not reached the disk, including after a failed write
+        self.dirty = False
+        self.version = 0
+        self._body = None
+
+        self.templates = {}
+        if os.path.exists(json_path):
+            with open(json_path, 'r') as f:
+                self.templates = json.load(f)
+
+    @property
+    def etag(self):
+        return f"templates-{id(self):x}-{self.version}"
+
+    def snapshot(self):
+        """Return (etag, serialized JSON) of all templates, serialized once per version."""
+        with self.lock:
+            if self._body is None:
+                self._body = json.dumps(self.templates)
+            return self.etag, self._body
+
+    def create(self, template_data):
+        template_id = str(uuid4())
+        with self.lock:
+            self.templates[template_id] = template_data
+            self._changed()
+        return template_id
+
+    def update(self, template_id, template_data):
+        """Replace a template. Returns False if it does not exist."""
+        with self.lock:
+            if template_id not in self.templates:
+                return False
+            self.templates[template_id] = template_data
+            self._changed()
+        return True
+
+    def delete(self, template_id):
+        """Delete a template. Returns False if it does not exist."""
+        with self.lock:
+            if template_id not in self.templates:
+                return False
+            del self.templates[template_id]
+            self._changed()
+        return True
+
+    def _changed(self):
+        # Caller holds self.lock
+        self.version += 1
+        self._body = None
+        self.dirty = True
+        if self.flush_timer is None:
+            self.flush_timer = threading.Timer(self.flush_delay, self._flush_in_background)
+            self.flush_timer.daemon = True
+            self.flush_timer.start()
+
+    def flush(self):
+        """Write the current templates to disk atomically. Raises if the write fails; the edits stay dirty."""
+        with self.flush_lock:
+            with self.lock:
+                self.flush_timer = None
+                self.dirty = False
+                templates = dict(self.templates)
+            try:
+                atomic_write_json(self.json_path, templates)
+            except Exception:
+                # Retried by the next edit's flush, or by close()
+                with self.lock:
+                    self.dirty = True
+                raise
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except Exception:
+            logging.getLogger(__name__).exception("Failed to write %s, retrying on the next change", self.json_path)
+
+    def close(self):
+        with self.lock:
+            timer = self.flush_timer
+            dirty = self.dirty
+        if timer is not None:
+            timer.cancel()
+        if timer is not None or dirty:
+            self.flush()
@@ -0,0 +1,73 @@
+import datetime
+
+import pytest
+
+from action_scheduler import ActionPolicy, ActionScheduler
+from lead_store import LeadStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    lead_store = LeadStore(str(tmp_path / 'leads.db'))
+    yield lead_store
+    lead_store.close()
+
+
+def make_scheduler(store, **policy):
+    fields = dict(per_hour=3600, burst=100, daily_cap=3, weekly_cap=10, jitter_median=0)
+    fields.update(policy)
+    return ActionScheduler('account', store, {'connect': ActionPolicy(**fields)})
+
+
+def test_daily_cap_stops_actions(store):
+    scheduler = make_scheduler(store)
+    assert [scheduler.acquire('connect') for _ in range(4)] == [True, True, True, False]
+    assert scheduler.usage()['connect']['today'] == 3
+    assert scheduler.remaining('connect') == 0
+
+
+def test_weekly_cap_counts_earlier_days(store):
+    scheduler = make_scheduler(store, daily_cap=None, weekly_cap=5)
+    three_days_ago = (datetime.date.today() - datetime.timedelta(days=3)).isoformat()
+    with store.lock, store.conn:
+        store.conn.execute(
+            "INSERT INTO action_log (account, action, day, count) VALUES ('account', 'connect', ?, 4)",
+            (three_days_ago,)
+        )
+    assert scheduler.acquire('connect')
+    assert not scheduler.acquire('connect')
+
+
+def test_caps_survive_a_new_scheduler(store):
+    make_scheduler(store, daily_cap=2).acquire('connect')
+    assert make_scheduler(store, daily_cap=2).remaining('connect') == 1
+
+
+def test_job_limits_cannot_raise_account_caps(store):
+    scheduler = make_scheduler(store)
+    for _ in range(3):
+        scheduler.acquire('connect')
+
+    job = scheduler.for_job({'connect': {'daily_cap': 500, 'per_hour': 100000}})
+    assert job.policies['connect'].daily_cap == 3
+    assert job.policies['connect'].per_hour == 3600
+    assert job.remaining('connect') == 0
+    assert not job.acquire('connect')
+    assert scheduler.usage()['connect']['today'] == 3
+
+
+def test_job_limits_tighten_without_changing_the_account(store):
+    scheduler = make_scheduler(store)
+    job = scheduler.for_job({'connect': {'daily_cap': 1}})
+    assert job.acquire('connect')
+    assert not job.acquire('connect')
+    assert scheduler.policies['connect'].daily_cap == 3
+    assert scheduler.acquire('connect')
+
+
+def test_configure_keeps_the_bucket_level(store):
+    scheduler = make_scheduler(store, burst=2, per_hour=1)
+    scheduler.acquire('connect')
+    scheduler.acquire('connect')
+    scheduler.configure({'connect': {'burst': 5}})
+    assert scheduler.wait_time('connect') > 0
@@ -0,0 +1,63 @@
+import json
+import threading
+
+from lead_journal import LeadJournal, compact, iter_journal
+
+
+def lead(number):
+    return {'name': f'Lead {number}', 'profile_url': f'https://www.linkedin.com/sales/lead/ACw{number},NAME_SEARCH,x'}
+
+
+def test_append_skips_known_members(tmp_path):
+    main_file = tmp_path / 'leads_data.json'
+    main_file.write_text(json.dumps([lead(1)]))
+    journal = LeadJournal(str(tmp_path / 'leads_data.jsonl'), main_file_path=str(main_file))
+    assert not journal.append(lead(1))
+    assert journal.append(lead(2))
+    assert not journal.append(lead(2))
+    journal.close()
+
+
+def test_torn_last_line_does_not_swallow_the_next_append(tmp_path):
+    journal_path = tmp_path / 'leads_data.jsonl'
+    journal_path.write_text(json.dumps(lead(1)) + '\n{"name": "Lead 2", "profile_u')
+
+    assert [entry['name'] for entry in iter_journal(str(journal_path))] == ['Lead 1']
+
+    journal = LeadJournal(str(journal_path))
+    assert journal.append(lead(3))
+    journal.close()
+    assert [entry['name'] for entry in iter_journal(str(journal_path))] == ['Lead 1', 'Lead 3']
+
+
+def test_compact_moves_leads_into_the_main_file(tmp_path):
+    journal_path = tmp_path / 'leads_data.jsonl'
+    main_file = tmp_path / 'leads_data.json'
+    main_file.write_text(json.dumps([lead(1)]))
+    journal_path.write_text(''.join(json.dumps(entry) + '\n' for entry in (lead(1), lead(2), lead(3))))
+
+    assert compact(str(journal_path), str(main_file)) == 2
+    assert [entry['name'] for entry in json.loads(main_file.read_text())] == ['Lead 1', 'Lead 2', 'Lead 3']
+    assert journal_path.read_text() == ''
+    assert compact(str(journal_path), str(main_file)) == 0
+
+
+def test_compact_while_appending_loses_nothing(tmp_path):
+    journal_path = str(tmp_path / 'leads_data.jsonl')
+    main_file = str(tmp_path / 'leads_data.json')
+    journal = LeadJournal(journal_path, main_file_path=main_file, fsync_policy='never')
+
+    def append_leads():
+        for number in range(500):
+            journal.append(lead(number))
+
+    writer = threading.Thread(target=append_leads)
+    writer.start()
+    while writer.is_alive():
+        compact(journal_path, main_file)
+    writer.join()
+    journal.close()
+    compact(journal_path, main_file)
+
+    with open(main_file) as f:
+        assert len(json.load(f)) == 500
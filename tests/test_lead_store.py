@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from lead_identity import SeenLeadIndex
+from lead_store import LeadStore
+
+
+def lead(member, suffix='NAME_SEARCH,abc', **fields):
+    return dict(fields, name=f'Lead {member}', profile_url=f'https://www.linkedin.com/sales/lead/{member},{suffix}')
+
+
+@pytest.fixture
+def store(tmp_path):
+    lead_store = LeadStore(str(tmp_path / 'leads.db'))
+    yield lead_store
+    lead_store.close()
+
+
+def test_same_member_under_different_urls_is_stored_once(store):
+    assert store.add_leads([lead('ACw1'), lead('ACw1', suffix='OUT_OF_NETWORK,xyz')], 't1', '2024-01-01') == 1
+    assert store.count_leads() == 1
+
+
+def test_re_adding_a_lead_without_template_is_not_new(store):
+    assert [store.add_leads([lead('ACw1')]) for _ in range(3)] == [1, 0, 0]
+
+
+def test_untagged_lead_gains_a_template_once(store):
+    store.add_leads([lead('ACw1')])
+    assert store.add_leads([lead('ACw1')], 't1', '2024-01-01') == 1
+    assert store.add_leads([lead('ACw1')], 't2', '2024-01-01') == 0
+    assert store.count_by_template() == {'t1': 1}
+
+
+def test_counts_and_history_by_template(store):
+    store.add_leads([lead('ACw1', connection_status='success'), lead('ACw2', connection_sent=False)],
+                    't1', '2024-01-01')
+    store.add_leads([lead('ACw3', connection_sent=True)], 't1', '2024-01-02')
+    store.add_leads([lead('ACw4')], 't2', '2024-01-02')
+    assert store.count_by_template() == {'t1': 3, 't2': 1}
+
+    history, next_cursor = store.get_history('t1', limit=1)
+    assert next_cursor == '2024-01-02'
+    assert [entry['date'] for entry in history] == ['2024-01-02']
+    # connection_sent from imported files is normalized into connection_status
+    assert history[0]['leads'][0]['connection_status'] == 'success'
+
+
+def test_contacting_an_imported_lead_upgrades_its_status(store):
+    store.add_leads([lead('ACw1', connection_sent=False), lead('ACw2')], 't1', '2024-01-01')
+    assert 'ACw1' not in SeenLeadIndex(store)
+    assert 'ACw2' not in SeenLeadIndex(store, use_bloom=True)
+
+    revision = store.revision()
+    assert store.add_leads([lead('ACw1', connection_status='success', note_sent='Hi')], 't2') == 0
+    assert store.revision() != revision
+    assert 'ACw1' in SeenLeadIndex(store)
+    assert store.count_by_template() == {'t1': 2}
+
+
+def test_export_filters_and_yields_each_profile_once(store):
+    store.add_leads([lead(f'ACw{i}', connection_status='success' if i % 2 else 'not_sent') for i in range(10)],
+                    't1', '2024-01-01')
+    # ACw1 shows up again under t2 and stays a single row
+    store.add_leads([lead(f'ACw{i}', connection_status='success') for i in (1, 10, 11, 12, 13, 14)], 't2', '2024-01-02')
+
+    everything = list(store.iter_export(batch_size=3))
+    assert len(everything) == 15
+    assert len({row['member_id'] for row in everything}) == 15
+
+    rows = list(store.iter_export(template='t1', statuses=['success'], batch_size=2))
+    assert [row['member_id'] for row in rows] == ['ACw1', 'ACw3', 'ACw5', 'ACw7', 'ACw9']
+    assert [row['member_id'] for row in store.iter_export(date_from='2024-01-02')] == [f'ACw{i}' for i in range(10, 15)]
+
+
+def test_import_skips_unchanged_files(store, tmp_path):
+    db_dir = tmp_path / 'db'
+    db_dir.mkdir()
+    daily_file = db_dir / '2024-01-01-Template_A.json'
+    daily_file.write_text(json.dumps([lead('ACw1'), lead('ACw2')]))
+    main_file = db_dir / 'leads_data.json'
+    main_file.write_text(json.dumps([lead('ACw3')]))
+
+    assert store.import_json_files(str(db_dir), str(tmp_path / 'data')) == 3
+    assert store.import_json_files(str(db_dir), str(tmp_path / 'data')) == 0
+
+    # The main file is only read once; the scraper writes later leads to the store itself
+    main_file.write_text(json.dumps([lead('ACw3'), lead('ACw4')]))
+    assert store.import_json_files(str(db_dir), str(tmp_path / 'data')) == 0
+    assert store.import_json_files(str(db_dir), str(tmp_path / 'data'), force=True) == 1
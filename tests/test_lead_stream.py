@@ -0,0 +1,41 @@
+import io
+import json
+
+import pytest
+
+from lead_stream import iter_leads, iter_leads_from_file
+
+LEADS = [{'name': f'Lead {i}', 'profile_url': f'https://example.com/{i}', 'score': i * 1.5} for i in range(20)]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64 * 1024])
+def test_list_layout(chunk_size):
+    text = json.dumps(LEADS, indent=2)
+    assert list(iter_leads_from_file(io.StringIO(text), chunk_size)) == LEADS
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64 * 1024])
+def test_snapshot_layout_with_metadata(chunk_size):
+    text = json.dumps({'template': 'A', 'meta': {'pages': [1, 2]}, 'leads': LEADS, 'after': True})
+    assert list(iter_leads_from_file(io.StringIO(text), chunk_size)) == LEADS
+
+
+def test_number_at_a_chunk_boundary_is_not_truncated():
+    text = json.dumps([12345678, {'n': 987654321}])
+    assert list(iter_leads_from_file(io.StringIO(text), 4)) == [12345678, {'n': 987654321}]
+
+
+@pytest.mark.parametrize('text', ['[]', '{}', '{"leads": []}', '', '  '])
+def test_empty_documents(text):
+    assert list(iter_leads_from_file(io.StringIO(text))) == []
+
+
+def test_malformed_list_raises():
+    with pytest.raises(ValueError):
+        list(iter_leads_from_file(io.StringIO('[{"a": 1} {"b": 2}]')))
+
+
+def test_reads_from_path(tmp_path):
+    path = tmp_path / 'leads.json'
+    path.write_text(json.dumps({'leads': LEADS}))
+    assert sum(1 for _ in iter_leads(str(path))) == len(LEADS)